@@ -8,6 +8,8 @@ from alembic import context
 
 # Import base and models
 from app.core.config import database_url
+from app.crud.price_history import listing_price_history
+from app.crud.stats import listing_stats_refresh
 from app.db.base import Base
 from app.db.models import listings  # noqa: F401
 
@@ -27,11 +29,24 @@ target_metadata = Base.metadata
 config.set_main_option("sqlalchemy.url", database_url)
 
 
+# Tables managed in SQL by their migrations and not declared in the metadata:
+# listing_price_history with its monthly partitions, and listing_stats_refresh.
+SQL_MANAGED_TABLES = (listing_price_history.name, listing_stats_refresh.name)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Autogenerate would otherwise emit drop_table for all of them.
+    if type_ == "table" and reflected and compare_to is None:
+        return not name.startswith(SQL_MANAGED_TABLES)
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -44,7 +59,11 @@ def run_migrations_online() -> None:
     connectable = create_engine(database_url, poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
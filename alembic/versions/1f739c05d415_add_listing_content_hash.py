@@ -0,0 +1,28 @@
+"""add listing content hash
+
+Revision ID: 1f739c05d415
+Revises: 8be8b6dfde82
+Create Date: 2025-05-12 10:04:31.218554
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1f739c05d415"
+down_revision: Union[str, None] = "8be8b6dfde82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash and are rewritten once on their next publish.
+    op.add_column("listings", sa.Column("content_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("listings", "content_hash")
@@ -0,0 +1,120 @@
+"""add listing coordinates
+
+Revision ID: 2f6d8a3c9e47
+Revises: 7c3e5a9d1b42
+Create Date: 2025-06-09 09:41:05.872310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6d8a3c9e47"
+down_revision: Union[str, None] = "7c3e5a9d1b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Area centroids (latitude, longitude) and their geohashes, frozen from
+# src/utils/geo_utils.py as of this revision so later changes to the table do
+# not alter what this migration does.
+AREA_LOCATIONS = {
+    "abelemkpe": (5.606, -0.209, "ebzzghxc3"),
+    "abokobi": (5.73, -0.196, "ecpbee178"),
+    "accra central": (5.55, -0.205, "ebzze66ep"),
+    "achimota": (5.617, -0.233, "ebzzfww36"),
+    "adabraka": (5.563, -0.208, "ebzzek8wc"),
+    "adenta": (5.708, -0.155, "ecpbkrp5s"),
+    "airport residential": (5.6036, -0.176, "ebzzgupg6"),
+    "amasaman": (5.702, -0.3, "ecpb3nj89"),
+    "ashaiman": (5.695, -0.033, "ecpbrhxzz"),
+    "asylum down": (5.57, -0.205, "ebzzemfxx"),
+    "baatsona": (5.628, -0.113, "ecpbj2t9q"),
+    "cantonments": (5.578, -0.172, "ebzzsp6y0"),
+    "dansoman": (5.547, -0.26, "ebzzd1f9t"),
+    "dodowa": (5.883, -0.098, "ecpcmybwu"),
+    "dome": (5.65, -0.235, "ecpb4sscs"),
+    "dzorwulu": (5.609, -0.2, "ebzzgmn6g"),
+    "east legon": (5.635, -0.16, "ecpbh3g6r"),
+    "east legon hills": (5.69, -0.13, "ecpbm5c6d"),
+    "haatso": (5.67, -0.205, "ecpb724wp"),
+    "kaneshie": (5.57, -0.24, "ebzzdtcpx"),
+    "kasoa": (5.534, -0.42, "ebzxqrqjv"),
+    "kokomlemle": (5.58, -0.212, "ebzzepv9u"),
+    "kpone": (5.7, 0.04, "s1002vthu"),
+    "kwabenya": (5.68, -0.232, "ecpb6dp06"),
+    "labadi": (5.56, -0.147, "ebzzsshvq"),
+    "labone": (5.566, -0.172, "ebzzsj6b2"),
+    "lapaz": (5.606, -0.25, "ebzzfk9cq"),
+    "lashibi": (5.635, -0.065, "ecpbn9bdm"),
+    "legon": (5.651, -0.187, "ecpb5sxz6"),
+    "madina": (5.668, -0.166, "ecpbhpz47"),
+    "mccarthy hill": (5.557, -0.292, "ebzz97e7g"),
+    "north kaneshie": (5.588, -0.237, "ebzzf972m"),
+    "north legon": (5.67, -0.19, "ecpb78jwh"),
+    "nungua": (5.601, -0.077, "ebzzy5xuj"),
+    "ofankor": (5.66, -0.265, "ecpb1yr5c"),
+    "ogbojo": (5.656, -0.146, "ecpbhttst"),
+    "osu": (5.556, -0.182, "ebzzeg7qp"),
+    "oyarifa": (5.748, -0.177, "ecpbeyrhe"),
+    "pokuase": (5.685, -0.28, "ecpb3duje"),
+    "ridge": (5.563, -0.196, "ebzzes9qb"),
+    "roman ridge": (5.598, -0.194, "ebzzge4dx"),
+    "sakumono": (5.615, -0.045, "ebzzyypjx"),
+    "shiashie": (5.619, -0.166, "ebzzunzj5"),
+    "spintex": (5.636, -0.103, "ecpbjdhbp"),
+    "taifa": (5.66, -0.245, "ecpb4qmeg"),
+    "tema": (5.669, -0.017, "ecpbr8587"),
+    "tesano": (5.603, -0.228, "ebzzfgczz"),
+    "teshie": (5.583, -0.107, "ebzzv8656"),
+    "weija": (5.559, -0.334, "ebzz87uz9"),
+}
+
+
+def upgrade() -> None:
+    op.add_column("listings", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("listings", sa.Column("longitude", sa.Float(), nullable=True))
+    op.add_column("listings", sa.Column("geohash", sa.String(12), nullable=True))
+
+    # Place existing listings at the centroid of their area, where it is known,
+    # in one statement so it also runs with --sql. Area names are normalized
+    # like geo_utils does, dropping a trailing "area" or "estate(s)".
+    locations = ", ".join(
+        f"('{area}', {latitude}, {longitude}, '{geohash}')"
+        for area, (latitude, longitude, geohash) in AREA_LOCATIONS.items()
+    )
+    op.execute(
+        f"""
+        UPDATE listings
+        SET latitude = located.latitude,
+            longitude = located.longitude,
+            geohash = located.geohash
+        FROM (VALUES {locations}) AS located (area, latitude, longitude, geohash)
+        WHERE listings.area IS NOT NULL
+          AND located.area = regexp_replace(
+              btrim(regexp_replace(lower(listings.area), '[^a-z0-9]+', ' ', 'g')),
+              ' (area|estate|estates)$',
+              ''
+          )
+        """
+    )
+
+    # text_pattern_ops lets prefix range scans use the index whatever the
+    # database collation.
+    op.create_index(
+        "ix_listings_geohash",
+        "listings",
+        ["geohash"],
+        unique=False,
+        postgresql_ops={"geohash": "text_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_geohash", table_name="listings")
+    op.drop_column("listings", "geohash")
+    op.drop_column("listings", "longitude")
+    op.drop_column("listings", "latitude")
@@ -0,0 +1,83 @@
+"""add listing stats materialized view
+
+Revision ID: 3d7b1e9c5a24
+Revises: 9a4f6b2d3e18
+Create Date: 2025-05-28 10:12:47.305118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3d7b1e9c5a24"
+down_revision: Union[str, None] = "9a4f6b2d3e18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per (listing_type, dimension, value). Dimension 'all' holds the
+    # per-type totals, and listing_type '' the totals across both types.
+    # Scraped listings store a missing location as '' while API-created ones
+    # leave it NULL; both are grouped together as value ''.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW listing_stats AS
+        SELECT
+            CASE
+                WHEN GROUPING(listing_type) = 1 THEN ''
+                ELSE COALESCE(listing_type, 'unknown')
+            END AS listing_type,
+            CASE
+                WHEN GROUPING(region) = 0 THEN 'region'
+                WHEN GROUPING(area) = 0 THEN 'area'
+                WHEN GROUPING(bedrooms) = 0 THEN 'bedrooms'
+                WHEN GROUPING(house_type) = 0 THEN 'house_type'
+                ELSE 'all'
+            END AS dimension,
+            COALESCE(region, area, bedrooms::text, house_type, '') AS value,
+            COUNT(*) AS listings,
+            COUNT(price) AS priced_listings,
+            MIN(price) AS price_min,
+            percentile_cont(0.25) WITHIN GROUP (ORDER BY price) AS price_p25,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS price_median,
+            percentile_cont(0.75) WITHIN GROUP (ORDER BY price) AS price_p75,
+            percentile_cont(0.9) WITHIN GROUP (ORDER BY price) AS price_p90,
+            MAX(price) AS price_max,
+            AVG(price)::float AS price_mean
+        FROM (
+            SELECT
+                NULLIF(listing_type, '') AS listing_type,
+                NULLIF(region, '') AS region,
+                NULLIF(area, '') AS area,
+                bedrooms,
+                NULLIF(house_type, '') AS house_type,
+                price
+            FROM listings
+        ) AS normalized
+        GROUP BY GROUPING SETS (
+            (),
+            (listing_type),
+            (listing_type, region),
+            (listing_type, area),
+            (listing_type, bedrooms),
+            (listing_type, house_type)
+        )
+        """
+    )
+    # Needed for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+    op.execute(
+        "CREATE UNIQUE INDEX ux_listing_stats_key "
+        "ON listing_stats (listing_type, dimension, value)"
+    )
+    # The refresh time lives outside the view: a column stamped with now()
+    # would differ on every row, and a concurrent refresh would rewrite them all.
+    op.execute("CREATE TABLE listing_stats_refresh (refreshed_at TIMESTAMPTZ NOT NULL)")
+    op.execute("INSERT INTO listing_stats_refresh VALUES (now())")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS listing_stats_refresh")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS listing_stats")
@@ -0,0 +1,28 @@
+"""add listings keyset index
+
+Revision ID: 5c2e8d41a7b3
+Revises: 1f739c05d415
+Create Date: 2025-05-19 09:12:47.503116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2e8d41a7b3"
+down_revision: Union[str, None] = "1f739c05d415"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Scanned backwards for ORDER BY scraped_at DESC, id DESC keyset pages.
+    op.create_index(
+        "ix_listings_scraped_at_id", "listings", ["scraped_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_scraped_at_id", table_name="listings")
@@ -0,0 +1,150 @@
+"""add listing price history
+
+Revision ID: 5e1b9d7c3a60
+Revises: 2f6d8a3c9e47
+Create Date: 2025-06-12 14:27:51.604392
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e1b9d7c3a60"
+down_revision: Union[str, None] = "2f6d8a3c9e47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Append-only, one row per observed price. Area, bedrooms and type are
+    # copied in so trend queries never join back to listings.
+    op.execute(
+        """
+        CREATE TABLE listing_price_history (
+            listing_id VARCHAR NOT NULL,
+            listing_type TEXT,
+            area VARCHAR,
+            bedrooms INTEGER,
+            price INTEGER NOT NULL,
+            previous_price INTEGER,
+            changed_at TIMESTAMP NOT NULL DEFAULT localtimestamp
+        ) PARTITION BY RANGE (changed_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_listing_price_history_area_bedrooms "
+        "ON listing_price_history (area, bedrooms, changed_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_listing_price_history_listing_id "
+        "ON listing_price_history (listing_id, changed_at)"
+    )
+
+    # Monthly partitions are created on first use. The advisory lock keeps two
+    # concurrent writers from racing to create the same month.
+    op.execute(
+        """
+        CREATE FUNCTION listing_price_history_partition(ts TIMESTAMP)
+        RETURNS void AS $$
+        DECLARE
+            month_start DATE := date_trunc('month', ts);
+            partition TEXT := 'listing_price_history_' || to_char(month_start, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition) IS NOT NULL THEN
+                RETURN;
+            END IF;
+            PERFORM pg_advisory_xact_lock(hashtext(partition));
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF listing_price_history '
+                'FOR VALUES FROM (%L) TO (%L)',
+                partition, month_start, month_start + INTERVAL '1 month'
+            );
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+    # Statement-level triggers read the whole batch from transition tables, so
+    # a bulk upsert or publish merge writes its history in one INSERT.
+    op.execute(
+        """
+        CREATE FUNCTION record_listing_prices_inserted()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM listing_price_history_partition(localtimestamp);
+            INSERT INTO listing_price_history
+                (listing_id, listing_type, area, bedrooms, price)
+            SELECT listing_id, listing_type, area, bedrooms, price
+            FROM new_rows
+            WHERE price IS NOT NULL;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION record_listing_prices_updated()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM listing_price_history_partition(localtimestamp);
+            INSERT INTO listing_price_history
+                (listing_id, listing_type, area, bedrooms, price, previous_price)
+            SELECT n.listing_id, n.listing_type, n.area, n.bedrooms, n.price, o.price
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE n.price IS NOT NULL AND n.price IS DISTINCT FROM o.price;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER listings_price_history_insert
+        AFTER INSERT ON listings
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_listing_prices_inserted()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER listings_price_history_update
+        AFTER UPDATE ON listings
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_listing_prices_updated()
+        """
+    )
+
+    # Seed the history with current prices, dated when each listing was posted.
+    op.execute(
+        """
+        SELECT listing_price_history_partition(month)
+        FROM (
+            SELECT DISTINCT date_trunc('month', COALESCE(posted_date, scraped_at)) AS month
+            FROM listings
+            WHERE price IS NOT NULL AND COALESCE(posted_date, scraped_at) IS NOT NULL
+        ) months
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO listing_price_history
+            (listing_id, listing_type, area, bedrooms, price, changed_at)
+        SELECT listing_id, listing_type, area, bedrooms, price,
+               COALESCE(posted_date, scraped_at)
+        FROM listings
+        WHERE price IS NOT NULL AND COALESCE(posted_date, scraped_at) IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS listings_price_history_update ON listings")
+    op.execute("DROP TRIGGER IF EXISTS listings_price_history_insert ON listings")
+    op.execute("DROP FUNCTION IF EXISTS record_listing_prices_updated()")
+    op.execute("DROP FUNCTION IF EXISTS record_listing_prices_inserted()")
+    op.execute("DROP TABLE IF EXISTS listing_price_history")
+    op.execute("DROP FUNCTION IF EXISTS listing_price_history_partition(TIMESTAMP)")
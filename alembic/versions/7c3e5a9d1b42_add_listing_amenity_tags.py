@@ -0,0 +1,140 @@
+"""add listing amenity tags
+
+Revision ID: 7c3e5a9d1b42
+Revises: e4a9c2b7f016
+Create Date: 2025-06-06 11:03:22.518764
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e5a9d1b42"
+down_revision: Union[str, None] = "e4a9c2b7f016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Normalized amenity names and their tags, frozen from
+# src/utils/amenity_utils.py as of this revision so later vocabulary changes
+# do not alter what this migration does.
+AMENITY_ALIASES = {
+    "24 7 electricity": "24_hour_electricity",
+    "24 hour electricity": "24_hour_electricity",
+    "24 hour security": "security",
+    "24 hours electricity": "24_hour_electricity",
+    "24hr electricity": "24_hour_electricity",
+    "a c": "air_conditioning",
+    "ac": "air_conditioning",
+    "air conditioner": "air_conditioning",
+    "air conditioning": "air_conditioning",
+    "balcony": "balcony",
+    "borehole": "water_supply",
+    "boys quarter": "boys_quarters",
+    "boys quarters": "boys_quarters",
+    "bq": "boys_quarters",
+    "built in wardrobe": "wardrobe",
+    "car park": "parking",
+    "cctv": "cctv",
+    "cctv cameras": "cctv",
+    "chandelier": "chandelier",
+    "constant electricity": "24_hour_electricity",
+    "constant light": "24_hour_electricity",
+    "dining area": "dining_area",
+    "dining room": "dining_area",
+    "dishwasher": "dishwasher",
+    "fenced": "walled_gated",
+    "fitness center": "gym",
+    "fitness centre": "gym",
+    "fridge": "refrigerator",
+    "garage": "parking",
+    "garden": "garden",
+    "gated": "walled_gated",
+    "gym": "gym",
+    "hot water": "hot_water",
+    "internet": "wifi",
+    "kitchen cabinet": "kitchen_cabinets",
+    "kitchen cabinets": "kitchen_cabinets",
+    "kitchen shelf": "kitchen_shelf",
+    "kitchen shelves": "kitchen_shelf",
+    "microwave": "microwave",
+    "parking": "parking",
+    "parking space": "parking",
+    "poly tank": "water_supply",
+    "pool": "swimming_pool",
+    "pop ceiling": "pop_ceiling",
+    "pre paid meter": "prepaid_meter",
+    "prepaid meter": "prepaid_meter",
+    "refrigerator": "refrigerator",
+    "security": "security",
+    "security cameras": "cctv",
+    "security guard": "security",
+    "security post": "security",
+    "swimming pool": "swimming_pool",
+    "tiled floor": "tiled_floor",
+    "tiled floors": "tiled_floor",
+    "wall fence": "walled_gated",
+    "walled": "walled_gated",
+    "walled gated": "walled_gated",
+    "wardrobe": "wardrobe",
+    "wardrobes": "wardrobe",
+    "water heater": "hot_water",
+    "water supply": "water_supply",
+    "water tank": "water_supply",
+    "wi fi": "wifi",
+    "wifi": "wifi",
+}
+
+
+def upgrade() -> None:
+    op.add_column(
+        "listings",
+        sa.Column("amenity_tags", postgresql.ARRAY(sa.Text()), nullable=True),
+    )
+
+    # Tag existing listings in one statement, so it also runs with --sql.
+    # Names are normalized like amenity_utils does: lowercased, with each run
+    # of other characters turned into a single space.
+    aliases = ", ".join(
+        f"('{alias}', '{tag}')" for alias, tag in AMENITY_ALIASES.items()
+    )
+    op.execute(
+        f"""
+        UPDATE listings
+        SET amenity_tags = tagged.tags
+        FROM (
+            SELECT
+                l.id,
+                COALESCE(
+                    array_agg(DISTINCT a.tag COLLATE "C" ORDER BY a.tag COLLATE "C")
+                        FILTER (WHERE a.tag IS NOT NULL),
+                    '{{}}'
+                ) AS tags
+            FROM listings l
+            LEFT JOIN LATERAL unnest(string_to_array(l.amenities, ',')) AS name
+                ON true
+            LEFT JOIN (VALUES {aliases}) AS a (alias, tag)
+                ON a.alias = btrim(regexp_replace(lower(name), '[^a-z0-9]+', ' ', 'g'))
+            WHERE l.amenities IS NOT NULL
+            GROUP BY l.id
+        ) AS tagged
+        WHERE listings.id = tagged.id
+        """
+    )
+
+    op.create_index(
+        "ix_listings_amenity_tags",
+        "listings",
+        ["amenity_tags"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_amenity_tags", table_name="listings")
+    op.drop_column("listings", "amenity_tags")
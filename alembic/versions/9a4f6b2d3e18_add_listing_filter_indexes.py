@@ -0,0 +1,57 @@
+"""add listing filter indexes
+
+Revision ID: 9a4f6b2d3e18
+Revises: 5c2e8d41a7b3
+Create Date: 2025-05-26 16:40:02.771904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f6b2d3e18"
+down_revision: Union[str, None] = "5c2e8d41a7b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Trigram indexes serve the ILIKE '%...%' region and area filters.
+    op.create_index(
+        "ix_listings_region_trgm",
+        "listings",
+        ["region"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"region": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_listings_area_trgm",
+        "listings",
+        ["area"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"area": "gin_trgm_ops"},
+    )
+
+    # listing_type is on almost every query: newest first, or a price range.
+    op.create_index(
+        "ix_listings_type_scraped_at_id",
+        "listings",
+        ["listing_type", "scraped_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_listings_type_price", "listings", ["listing_type", "price"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_type_price", table_name="listings")
+    op.drop_index("ix_listings_type_scraped_at_id", table_name="listings")
+    op.drop_index("ix_listings_area_trgm", table_name="listings")
+    op.drop_index("ix_listings_region_trgm", table_name="listings")
@@ -0,0 +1,56 @@
+"""add listing feature facets materialized view
+
+Revision ID: a6c4e2f8b913
+Revises: 5e1b9d7c3a60
+Create Date: 2025-06-18 09:41:26.518730
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c4e2f8b913"
+down_revision: Union[str, None] = "5e1b9d7c3a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Feature value counts over all listings, per listing_type and ('') across
+    # both, so unfiltered facet requests never expand every listing's features.
+    # Refreshed together with listing_stats.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW listing_feature_facets AS
+        SELECT
+            CASE
+                WHEN GROUPING(listing_type) = 1 THEN ''
+                ELSE COALESCE(listing_type, 'unknown')
+            END AS listing_type,
+            pairs.key,
+            pairs.value,
+            COUNT(*) AS listings
+        FROM (
+            SELECT NULLIF(listing_type, '') AS listing_type, features
+            FROM listings
+            WHERE jsonb_typeof(features) = 'object'
+        ) AS normalized
+        CROSS JOIN LATERAL jsonb_each_text(normalized.features) AS pairs
+        WHERE pairs.value IS NOT NULL
+        GROUP BY GROUPING SETS (
+            (pairs.key, pairs.value),
+            (listing_type, pairs.key, pairs.value)
+        )
+        """
+    )
+    # Needed for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+    op.execute(
+        "CREATE UNIQUE INDEX ux_listing_feature_facets_key "
+        "ON listing_feature_facets (listing_type, key, value)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS listing_feature_facets")
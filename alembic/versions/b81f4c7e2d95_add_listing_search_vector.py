@@ -0,0 +1,52 @@
+"""add listing search vector
+
+Revision ID: b81f4c7e2d95
+Revises: 3d7b1e9c5a24
+Create Date: 2025-06-02 09:27:13.640281
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f4c7e2d95"
+down_revision: Union[str, None] = "3d7b1e9c5a24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(amenities, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # A stored generated column is filled for existing rows here (rewriting the
+    # table once) and kept current by Postgres on every insert and update.
+    op.add_column(
+        "listings",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_listings_search_vector",
+        "listings",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_search_vector", table_name="listings")
+    op.drop_column("listings", "search_vector")
@@ -0,0 +1,34 @@
+"""add listing features index
+
+Revision ID: e4a9c2b7f016
+Revises: b81f4c7e2d95
+Create Date: 2025-06-04 14:51:38.902417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a9c2b7f016"
+down_revision: Union[str, None] = "b81f4c7e2d95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops only supports @>, which is all feature filters use, and is
+    # smaller and faster than the default jsonb_ops.
+    op.create_index(
+        "ix_listings_features",
+        "listings",
+        ["features"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"features": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_features", table_name="listings")
@@ -1,12 +1,81 @@
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy import text
+
+from app.core.cache import listing_cache
+from app.core.metrics import REQUEST_LATENCY, STARTED_AT, pool_status, render_metrics
+from app.core.predictor import price_predictor
+from app.core.stats import stats_refresher
+from app.db.routing import read_router
+from app.db.session import async_engine, read_engine
 
 router = APIRouter()
+# Served at /metrics, where Prometheus scrapes by default
+metrics_router = APIRouter()
+
+
+def api_engines() -> dict:
+    engines = {"primary": async_engine}
+    if read_router.has_replica:
+        engines["replica"] = read_engine
+    return engines
+
+
+async def ping(engine) -> dict:
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+@router.get(
+    "/",
+    summary="Health check endpoint",
+    description="Reports database reachability and pool usage per engine, the \
+    listing cache and request totals. Returns 503 when the primary database is \
+    unreachable.",
+)
+async def health_check():
+    databases = {}
+    for name, engine in api_engines().items():
+        databases[name] = {**await ping(engine), "pool": pool_status(engine)}
+    healthy = databases["primary"]["ok"]
+    return ORJSONResponse(
+        {
+            "status": "ok" if healthy else "degraded",
+            "message": "Smart Rental Pricing API is running",
+            "version": "1.0.0",
+            "uptime_seconds": round(time.time() - STARTED_AT),
+            "requests_served": REQUEST_LATENCY.total(),
+            "databases": databases,
+            "cache": listing_cache.metrics(),
+            "stats_refreshed_at": stats_refresher.last_refresh,
+            "price_models": {
+                listing_type: model.version
+                for listing_type, model in price_predictor.models.items()
+            },
+            "predictions": price_predictor.stats,
+        },
+        status_code=200 if healthy else 503,
+    )
 
 
-@router.get("/", summary="Health check endpoint")
-def health_check():
-    return {
-        "status": "ok",
-        "message": "Smart Rental Pricing API is running",
-        "version": "1.0.0",
-    }
+@metrics_router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Request latency, queries and database time per route, slow \
+    requests and queries, connection pool usage and cache counters, in the \
+    Prometheus text format.",
+    response_class=PlainTextResponse,
+)
+def metrics():
+    pools = {name: pool_status(engine) for name, engine in api_engines().items()}
+    return PlainTextResponse(
+        render_metrics(pools, listing_cache.metrics()),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,22 +1,80 @@
-from typing import List, Literal, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CachedResponse, listing_cache
 from app.core.config import ADMIN_KEY
+from app.core.dates import as_naive_utc, utc_now
+from app.core.etag import body_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.stats import stats_refresher
 from app.crud.listings import (
     create_listing,
     delete_listing,
     get_all_listings,
+    get_feature_facets,
     get_listing,
+    get_listing_hashes,
+    get_listings_by_ids,
+    get_nearby_listings,
+    search_listings,
     update_listing,
+    upsert_listings,
 )
-from app.dependencies.db import get_db
-from app.schema.listings import ListingCreate, ListingOut, ListingUpdate
+from app.crud.price_history import get_price_trends
+from app.crud.stats import get_listing_stats
+from app.db.routing import read_router
+from app.dependencies.db import get_db, get_read_db
+from app.dependencies.filters import listing_filters
+from app.schema.listings import (
+    LOOKUP_FIELDS,
+    MAX_LOOKUP_IDS,
+    SHORT_FIELDS,
+    STATS_DIMENSIONS,
+    BulkUpsertOut,
+    FeatureFacet,
+    ListingCreate,
+    ListingLookup,
+    ListingLookupOut,
+    ListingNearbyOut,
+    ListingOut,
+    ListingSearchOut,
+    ListingShort,
+    ListingStatsOut,
+    ListingUpdate,
+    PriceTrendOut,
+)
+from src.utils.geo_utils import area_coordinates
 
 router = APIRouter()
 
+# Read endpoints dump rows straight to JSON with orjson instead of validating
+# them through the response model again; response_model still documents them.
+LISTING_OUT_FIELDS = list(ListingOut.model_fields)
+
+
+async def listings_changed(response: Response):
+    read_router.record_write(response)
+    await listing_cache.invalidate()
+    stats_refresher.schedule()
+
+
+def listing_to_dict(listing, fields: List[str] = LISTING_OUT_FIELDS) -> dict:
+    # Loaded column values sit in the instance dict; reading them there skips
+    # the ORM attribute descriptors, which dominate the cost for large pages.
+    values = listing.__dict__
+    return {field: values.get(field) for field in fields}
+
+
+def serialize_listings(listings, fields: List[str] = LISTING_OUT_FIELDS) -> bytes:
+    return orjson.dumps([listing_to_dict(listing, fields) for listing in listings])
+
 
 @router.post(
     "/listing",
@@ -24,11 +82,13 @@ router = APIRouter()
     summary="Create a single listing",
     description="Adds one new listing to the database. Background logs listing ID after insertion.",
 )
-def add_listing(
+async def add_listing(
     listing: ListingCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
 ):
-    created = create_listing(db, listing)
+    created = await create_listing(db, listing)
+    await listings_changed(response)
     return created
 
 
@@ -38,40 +98,349 @@ def add_listing(
     summary="Create multiple listings",
     description="Adds multiple listings at once. Useful for batch scraping operations.",
 )
-def add_multiple_listings(
+async def add_multiple_listings(
     listings: List[ListingCreate],
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
 ):
-    created_listings = [create_listing(db, listing) for listing in listings]
+    created_listings = [await create_listing(db, listing) for listing in listings]
+    await listings_changed(response)
     return created_listings
 
 
+@router.put(
+    "/listings",
+    response_model=BulkUpsertOut,
+    summary="Upsert multiple listings",
+    description="Inserts new listings and updates existing ones in a single transaction. \
+    Reports whether each listing was created, updated or left unchanged.",
+)
+async def upsert_multiple_listings(
+    listings: List[ListingCreate],
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    results = await upsert_listings(db, listings)
+    counts = Counter(result["status"] for result in results)
+    if counts["created"] or counts["updated"]:
+        await listings_changed(response)
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "unchanged": counts["unchanged"],
+        "results": results,
+    }
+
+
 @router.get(
     "/listings",
-    response_model=List[ListingOut],
+    response_model=Union[List[ListingOut], List[ListingShort]],
+    responses={
+        200: {
+            "description": "ListingOut records, or ListingShort records with \
+            view=short. With fields=, each record holds exactly the requested \
+            ListingOut fields."
+        }
+    },
     summary="Retrieve listings",
-    description="Fetches listings with optional filters by region, min price, and max price. \
-    Results are sorted by most recent.",
+    description="Fetches listings with optional filters by region, area, min price, and max \
+    price. Results are sorted by most recent. When more results may follow, the \
+    X-Next-Cursor response header holds the cursor for the next page. Responses are \
+    cached for a short time and dropped whenever listings change. Send the ETag back \
+    in If-None-Match to get a 304 when the page has not changed. view=short returns \
+    the ListingShort fields only, and fields= returns exactly the listed fields; both \
+    skip the large description, amenities and features columns unless requested. \
+    amenities_all / amenities_any filter on canonical amenity tags, and feature.<key> \
+    parameters filter on features, e.g. feature.furnishing=Furnished.",
 )
-def get_listings(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, le=100),
-    region: Optional[str] = None,
-    min_price: Optional[int] = None,
-    max_price: Optional[int] = None,
-    listing_type: Optional[Literal["rent", "sale"]] = Query(
-        None, description="Only allow 'rent' or 'sale'"
+async def get_listings(
+    db: AsyncSession = Depends(get_read_db),
+    filters: dict = Depends(listing_filters),
+    skip: int = Query(0, ge=0, description="Offset pagination, ignored with cursor"),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor value from the previous page"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    view: Literal["short", "full"] = Query(
+        "full", description="short returns the ListingShort fields only"
+    ),
+    fields: Optional[List[LOOKUP_FIELDS]] = Query(
+        None, description="Only return these fields; overrides view"
     ),
+    if_none_match: Optional[str] = Header(None),
 ):
-    return get_all_listings(
+    if fields:
+        fields = list(dict.fromkeys(fields))
+    elif view == "short":
+        fields = SHORT_FIELDS
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = await listing_cache.make_key(
+        "listings",
+        {
+            "skip": None if cursor else skip,
+            "cursor": cursor,
+            "limit": limit,
+            "fields": fields,
+            **filters,
+        },
+    )
+    if cached := await listing_cache.get(key):
+        return cached.to_response(if_none_match)
+
+    listings = await get_all_listings(
         db=db,
         skip=skip,
         limit=limit,
-        region=region,
-        min_price=min_price,
-        max_price=max_price,
+        after=after,
+        fields=fields,
+        **filters,
+    )
+    headers = {"Cache-Control": "no-cache"}
+    if listings and len(listings) == limit:
+        last = listings[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.scraped_at, last.id)
+    body = serialize_listings(listings, fields or LISTING_OUT_FIELDS)
+    headers["ETag"] = body_etag(body, headers.get("X-Next-Cursor"))
+    cached = CachedResponse(body, headers)
+    await listing_cache.set(key, cached)
+    return cached.to_response(if_none_match)
+
+
+@router.get(
+    "/listings/search",
+    response_model=List[ListingSearchOut],
+    summary="Search listings",
+    description='Full-text search over titles, amenities and descriptions, e.g. \
+    "self contained", "boys quarters" or swimming pool -furnished. Results are \
+    ranked best match first (title hits weigh most) and combine with the usual filters, \
+    including feature filters such as feature.furnishing=Furnished.',
+)
+async def search(
+    q: str = Query(..., min_length=2, description='Words, "phrases", OR, -word'),
+    db: AsyncSession = Depends(get_read_db),
+    filters: dict = Depends(listing_filters),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    params = {"skip": skip, "limit": limit, **filters}
+    key = await listing_cache.make_key("search", {"q": q, **params})
+    if cached := await listing_cache.get(key):
+        return cached.to_response()
+
+    results = await search_listings(db, q, **params)
+    body = orjson.dumps(
+        [{**listing_to_dict(listing), "rank": rank} for listing, rank in results]
+    )
+    cached = CachedResponse(body)
+    await listing_cache.set(key, cached)
+    return cached.to_response()
+
+
+@router.get(
+    "/listings/nearby",
+    response_model=List[ListingNearbyOut],
+    summary="Listings near a place",
+    description="Listings within radius_km of an area (near=Airport Residential) or \
+    of a point (lat, lon), nearest first. Listing coordinates are the centroid of \
+    their area. Combines with the usual filters.",
+)
+async def get_nearby(
+    db: AsyncSession = Depends(get_read_db),
+    filters: dict = Depends(listing_filters),
+    near: Optional[str] = Query(None, description="Area to search around"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(3, gt=0, le=50),
+    limit: int = Query(20, ge=1, le=100),
+):
+    if near:
+        center = area_coordinates(near)
+        if center is None:
+            raise HTTPException(status_code=404, detail=f"Unknown area: '{near}'")
+    elif lat is not None and lon is not None:
+        center = (lat, lon)
+    else:
+        raise HTTPException(
+            status_code=400, detail="Provide near, or both lat and lon."
+        )
+
+    params = {"radius_km": radius_km, "limit": limit, **filters}
+    key = await listing_cache.make_key("nearby", {"center": center, **params})
+    if cached := await listing_cache.get(key):
+        return cached.to_response()
+
+    results = await get_nearby_listings(db, *center, **params)
+    body = orjson.dumps(
+        [
+            {**listing_to_dict(listing), "distance_km": round(distance, 3)}
+            for listing, distance in results
+        ]
+    )
+    cached = CachedResponse(body)
+    await listing_cache.set(key, cached)
+    return cached.to_response()
+
+
+@router.get(
+    "/listings/facets",
+    response_model=Dict[str, List[FeatureFacet]],
+    summary="Feature value counts",
+    description="Counts the values of each feature (furnishing, condition, ...) among \
+    listings matching the given filters, most common first. Takes the same filters as \
+    GET /listings, including feature filters such as feature.furnishing=Furnished. \
+    Without filters, or with listing_type only, the counts come from a precomputed \
+    view refreshed a few seconds after listings change.",
+)
+async def get_facets(
+    db: AsyncSession = Depends(get_read_db),
+    filters: dict = Depends(listing_filters),
+    keys: Optional[List[str]] = Query(None, description="Only count these features"),
+    facet_limit: int = Query(20, ge=1, le=100, description="Values per feature"),
+):
+    params = {"keys": keys, "facet_limit": facet_limit, **filters}
+    key = await listing_cache.make_key("facets", params)
+    if cached := await listing_cache.get(key):
+        return cached.to_response()
+
+    cached = CachedResponse(orjson.dumps(await get_feature_facets(db, **params)))
+    await listing_cache.set(key, cached)
+    return cached.to_response()
+
+
+# Hashes and lookups feed the publishers' write decisions, so they read the
+# primary rather than a replica that may lag.
+@router.get(
+    "/listings/hashes",
+    response_model=Dict[str, Optional[str]],
+    summary="Retrieve listing content hashes",
+    description="Maps every listing_id to the content hash of its stored version. \
+    Lets publishers skip listings that have not changed.",
+)
+async def get_hashes(
+    db: AsyncSession = Depends(get_db),
+    listing_type: Optional[Literal["rent", "sale"]] = Query(
+        None, description="Only allow 'rent' or 'sale'"
+    ),
+):
+    return ORJSONResponse(await get_listing_hashes(db, listing_type=listing_type))
+
+
+async def lookup_listings(
+    db: AsyncSession,
+    listing_ids: List[str],
+    fields: Optional[List[str]],
+    hashes_only: bool,
+):
+    if hashes_only:
+        fields = ["listing_id", "content_hash"]
+    found = await get_listings_by_ids(db, listing_ids, fields=fields)
+    found_ids = {row["listing_id"] for row in found}
+    missing = [
+        listing_id
+        for listing_id in dict.fromkeys(listing_ids)
+        if listing_id not in found_ids
+    ]
+    return ORJSONResponse({"found": found, "missing": missing})
+
+
+@router.get(
+    "/listings/stats",
+    response_model=List[ListingStatsOut],
+    summary="Listing price statistics",
+    description="Listing counts and price percentiles per listing_type, overall or \
+    broken down by region, area, bedrooms or house_type. Served from a precomputed \
+    view refreshed a few seconds after listings change; listing_type '' covers rent \
+    and sale together.",
+)
+async def get_stats(
+    db: AsyncSession = Depends(get_read_db),
+    listing_type: Optional[Literal["rent", "sale"]] = Query(
+        None, description="Only allow 'rent' or 'sale'"
+    ),
+    dimension: STATS_DIMENSIONS = Query("all"),
+    value: Optional[str] = Query(None, description="Only this region, area, etc."),
+    min_listings: int = Query(1, ge=1, description="Hide groups smaller than this"),
+):
+    return await get_listing_stats(
+        db,
+        listing_type=listing_type,
+        dimension=dimension,
+        value=value,
+        min_listings=min_listings,
+    )
+
+
+@router.get(
+    "/listings/trends",
+    response_model=List[PriceTrendOut],
+    summary="Listing price trends",
+    description="Median price per week or month for each area and bedroom count, \
+    from the price history recorded whenever a listing is added or its price \
+    changes. Covers the year before `until` (default now) unless `since` is given; \
+    the history is partitioned by month, so narrower ranges read less. Times with an \
+    offset are converted to UTC; times without one are taken as UTC.",
+)
+async def get_trends(
+    db: AsyncSession = Depends(get_read_db),
+    area: Optional[str] = None,
+    bedrooms: Optional[int] = Query(None, ge=0),
+    listing_type: Optional[Literal["rent", "sale"]] = Query(
+        None, description="Only allow 'rent' or 'sale'"
+    ),
+    since: Optional[datetime] = Query(None, description="Start of the range"),
+    until: Optional[datetime] = Query(None, description="End of the range (excluded)"),
+    interval: Literal["week", "month"] = Query("month"),
+    min_observations: int = Query(1, ge=1, description="Hide thinner periods"),
+):
+    until = as_naive_utc(until) or utc_now()
+    since = as_naive_utc(since) or until - timedelta(days=365)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until.")
+    return await get_price_trends(
+        db,
+        since=since,
+        until=until,
+        interval=interval,
+        area=area,
+        bedrooms=bedrooms,
         listing_type=listing_type,
+        min_observations=min_observations,
+    )
+
+
+@router.get(
+    "/listings/lookup",
+    response_model=ListingLookupOut,
+    summary="Look up listings by ID",
+    description=f"Fetches up to {MAX_LOOKUP_IDS} listings by listing_id in one query and \
+    reports the IDs that do not exist. Use fields or hashes_only to trim the records.",
+)
+async def lookup_listings_by_query(
+    db: AsyncSession = Depends(get_db),
+    ids: List[str] = Query(..., min_length=1, max_length=MAX_LOOKUP_IDS),
+    fields: Optional[List[LOOKUP_FIELDS]] = Query(None),
+    hashes_only: bool = Query(False),
+):
+    return await lookup_listings(db, ids, fields, hashes_only)
+
+
+@router.post(
+    "/listings/lookup",
+    response_model=ListingLookupOut,
+    summary="Look up listings by ID (body)",
+    description="Same as GET /listings/lookup, with the IDs sent in the request body \
+    for batches too long for a query string.",
+)
+async def lookup_listings_by_body(
+    lookup: ListingLookup, db: AsyncSession = Depends(get_db)
+):
+    return await lookup_listings(
+        db, lookup.listing_ids, lookup.fields, lookup.hashes_only
     )
 
 
@@ -79,28 +448,50 @@ def get_listings(
     "/listing/{listing_id}",
     response_model=ListingOut,
     summary="Get listing by ID",
-    description="Fetch a single listing using its unique listing_id.",
+    description="Fetch a single listing using its unique listing_id. Send the ETag \
+    back in If-None-Match to get a 304 when the listing has not changed.",
 )
-def get_listing_by_id(listing_id: str, db: Session = Depends(get_db)):
-    db_listing = get_listing(db, listing_id)
+async def get_listing_by_id(
+    listing_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    if_none_match: Optional[str] = Header(None),
+):
+    key = await listing_cache.make_key("listing", {"listing_id": listing_id})
+    if cached := await listing_cache.get(key):
+        return cached.to_response(if_none_match)
+
+    db_listing = await get_listing(db, listing_id)
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    return db_listing
+
+    body = orjson.dumps(listing_to_dict(db_listing))
+    headers = {"Cache-Control": "no-cache", "ETag": body_etag(body)}
+    cached = CachedResponse(body, headers)
+    await listing_cache.set(key, cached)
+    return cached.to_response(if_none_match)
 
 
 @router.put(
     "/listing/{listing_id}",
     response_model=ListingOut,
     summary="Update listing",
-    description="Updates an existing listing by its listing_id.",
+    description="Updates an existing listing by its listing_id. Like PUT /listings, \
+    the listing is only written when its content changes; posted_date alone does not \
+    count as a change.",
 )
-def update_listing_by_id(
-    listing_id: str, listing: ListingUpdate, db: Session = Depends(get_db)
+async def update_listing_by_id(
+    listing_id: str,
+    listing: ListingUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
 ):
     try:
-        return update_listing(db, listing_id, listing)
+        updated, written = await update_listing(db, listing_id, listing)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    if written:
+        await listings_changed(response)
+    return updated
 
 
 @router.delete(
@@ -108,11 +499,14 @@ def update_listing_by_id(
     summary="Delete listing",
     description="Deletes a single listing by its listing_id.",
 )
-def delete_listing_by_id(listing_id: str, db: Session = Depends(get_db)):
+async def delete_listing_by_id(
+    listing_id: str, response: Response, db: AsyncSession = Depends(get_db)
+):
     try:
-        delete_listing(db, listing_id)
+        await delete_listing(db, listing_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    await listings_changed(response)
     return {"detail": "Listing deleted"}
 
 
@@ -122,10 +516,11 @@ def delete_listing_by_id(listing_id: str, db: Session = Depends(get_db)):
     description="Truncates the listings table completely. Requires confirm=true and valid \
     admin_key header.",
 )
-def delete_all_listings(
+async def delete_all_listings(
+    response: Response,
     confirm: bool = Query(False),
     admin_key: str = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if not confirm:
         raise HTTPException(
@@ -136,6 +531,7 @@ def delete_all_listings(
     if admin_key != ADMIN_KEY:
         raise HTTPException(status_code=403, detail="You are not authorized.")
 
-    db.execute(text("TRUNCATE TABLE listings RESTART IDENTITY CASCADE;"))
-    db.commit()
+    await db.execute(text("TRUNCATE TABLE listings RESTART IDENTITY CASCADE;"))
+    await db.commit()
+    await listings_changed(response)
     return {"detail": "All listings have been wiped from the database."}
@@ -1,11 +1,18 @@
 import datetime
 import os
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.db import get_db
+from app.core import export
+from app.core.cache import listing_cache
+from app.core.dates import as_naive_utc
+from app.crud.listings import stream_listings
+from app.crud.stats import get_listing_counts
+from app.db.routing import read_router
+from app.dependencies.db import get_read_db
 from app.dependencies.security import require_admin
 
 router = APIRouter()
@@ -23,31 +30,70 @@ def version_info():
 @router.get(
     "/count",
     summary="Count total listings",
-    description="Returns total listings, as well as breakdown by rent and sale.",
+    description="Returns total listings, as well as breakdown by rent and sale. Read \
+    from the listing_stats view, so it may lag writes by a few seconds.",
     dependencies=[Depends(require_admin)],
 )
-def count_listings(db: Session = Depends(get_db)):
-    total = db.execute(text("SELECT COUNT(*) FROM listings")).scalar()
-    rent = db.execute(
-        text("SELECT COUNT(*) FROM listings WHERE listing_type = 'rent'")
-    ).scalar()
-    sale = db.execute(
-        text("SELECT COUNT(*) FROM listings WHERE listing_type = 'sale'")
-    ).scalar()
-
+async def count_listings(db: AsyncSession = Depends(get_read_db)):
+    counts = await get_listing_counts(db)
     return {
-        "total_listings": total,
-        "rent_listings": rent,
-        "sale_listings": sale,
+        "total_listings": counts.get("", 0),
+        "rent_listings": counts.get("rent", 0),
+        "sale_listings": counts.get("sale", 0),
     }
 
 
 @router.get(
     "/export",
-    summary="Export all listings as JSON",
+    summary="Export listings",
+    description="Streams listings as a JSON array, NDJSON, CSV or Parquet. Rows are read \
+    in batches through a server-side cursor, so memory use stays flat however large the \
+    table is. Parquet requires pyarrow on the API server.",
+    dependencies=[Depends(require_admin)],
+)
+async def export_listings(
+    request: Request,
+    format: Literal["json", "ndjson", "csv", "parquet"] = Query("json"),
+    listing_type: Optional[Literal["rent", "sale"]] = Query(
+        None, description="Only allow 'rent' or 'sale'"
+    ),
+    since: Optional[datetime.datetime] = Query(
+        None, description="Only listings scraped at or after this date/time"
+    ),
+    until: Optional[datetime.datetime] = Query(
+        None, description="Only listings scraped before this date/time"
+    ),
+):
+    if format == "parquet" and export.pa is None:
+        raise HTTPException(
+            status_code=501, detail="Parquet export requires pyarrow on the server."
+        )
+    # Checked before streaming starts: once the body is under way, an error can
+    # only cut it short.
+    since, until = as_naive_utc(since), as_naive_utc(until)
+    if since and until and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until.")
+
+    # The stream outlives the request's session, so it keeps its own connection.
+    own_writes = read_router.wrote_recently(request)
+
+    async def batches():
+        async with read_router.connect(own_writes) as conn:
+            async for batch in stream_listings(conn, listing_type, since, until):
+                yield batch
+
+    return StreamingResponse(
+        export.ENCODERS[format](batches()),
+        media_type=export.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=listings.{format}"},
+    )
+
+
+@router.get(
+    "/cache/stats",
+    summary="Response cache statistics",
+    description="Hits, misses and invalidations of the listing response cache.",
     dependencies=[Depends(require_admin)],
 )
-def export_listings(db: Session = Depends(get_db)):
-    result = db.execute(text("SELECT * FROM listings;"))
-    keys = result.keys()
-    return [dict(zip(keys, row)) for row in result.fetchall()]
+def cache_stats():
+    return listing_cache.metrics()
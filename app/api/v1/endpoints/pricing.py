@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
+
+from app.core.predictor import price_predictor
+from app.schema.pricing import PricePrediction, PriceRequest
+from src.utils.model_utils import listing_features
+
+router = APIRouter()
+
+
+@router.post(
+    "/predict",
+    response_model=PricePrediction,
+    summary="Recommend a price",
+    description="Predicts the price of a listing from its area, bedrooms, bathrooms, \
+    house type, furnishing and amenities, with an 80% range. Amenities may be \
+    scraped names or canonical tags. Uses the newest model trained by the pipeline's \
+    train step, loaded at startup.",
+)
+async def predict_price(request: PriceRequest):
+    model = price_predictor.models.get(request.listing_type)
+    if model is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"No {request.listing_type} price model has been trained yet.",
+        )
+
+    price, low, high = await price_predictor.predict(
+        request.listing_type, listing_features(request.model_dump())
+    )
+    return ORJSONResponse(
+        {
+            "listing_type": request.listing_type,
+            "predicted_price": round(price),
+            "price_low": round(low),
+            "price_high": round(high),
+            "model_version": model.version,
+        }
+    )
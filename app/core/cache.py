@@ -0,0 +1,227 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+from fastapi import Response
+
+from app.core.config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_TTL, CACHE_URL
+from app.core.etag import etag_matches
+from app.db.routing import reading_own_writes
+
+# Parameters the queries match case-insensitively (ILIKE and full-text search).
+# Everything else, such as listing IDs, cursors and feature values, is part of
+# the key exactly as sent.
+CASE_INSENSITIVE_PARAMS = {"region", "area", "q"}
+
+
+class CachedResponse:
+    """Serialized JSON body plus the headers to send with it."""
+
+    def __init__(self, body: bytes, headers: Optional[dict] = None):
+        self.body = body
+        self.headers = headers or {}
+
+    def to_response(self, if_none_match: Optional[str] = None) -> Response:
+        etag = self.headers.get("ETag")
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(
+            content=self.body, media_type="application/json", headers=self.headers
+        )
+
+    def dump(self) -> bytes:
+        return orjson.dumps(self.headers) + b"\n" + self.body
+
+    @classmethod
+    def load(cls, data: bytes) -> "CachedResponse":
+        headers, body = data.split(b"\n", 1)
+        return cls(body, orjson.loads(headers))
+
+
+class MemoryCacheBackend:
+    """
+    In-process stand-in for a shared cache server
+
+    Implements the same calls as RedisCacheBackend so the shared layer can be
+    exercised locally without running Redis.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value, expires_at = self._data.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key, (0, None))[0] or 0) + 1
+        self._data[key] = (value, None)
+        return value
+
+
+class RedisCacheBackend:
+    """Shared cache on Redis, used when CACHE_BACKEND=redis."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+class ResponseCache:
+    """
+    Read-through cache for serialized API responses
+
+    Entries live in an in-process LRU with a TTL and, when configured, in a
+    shared backend so several API workers can reuse each other's results.
+    Invalidation bumps a generation counter that is part of every key, which
+    drops all cached responses at once without scanning for them. With a
+    shared backend the counter lives there, so a write on one worker also
+    invalidates the others.
+
+    Args:
+        namespace: Prefix for keys in the shared backend
+        ttl: Seconds an entry stays valid
+        max_entries: Size of the in-process LRU
+        shared: Optional shared backend (Redis or its in-memory stand-in)
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int,
+        max_entries: int,
+        shared=None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.generation = 0
+        self._local = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    async def make_key(self, name: str, params: dict) -> str:
+        """
+        Key independent of parameter order, unset parameters and the case of
+        the case-insensitive filters
+
+        The current generation is part of the key, so a response computed
+        before an invalidation can never be stored as a fresh entry.
+        """
+        normalized = {
+            param: (
+                value.lower()
+                if param in CASE_INSENSITIVE_PARAMS and isinstance(value, str)
+                else value
+            )
+            for param, value in params.items()
+            if value not in (None, "")
+        }
+        digest = hashlib.sha1(orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS))
+        generation = await self._current_generation()
+        return f"{generation}:{name}:{digest.hexdigest()}"
+
+    async def _current_generation(self) -> int:
+        if self.shared is not None:
+            value = await self.shared.get(f"{self.namespace}:generation")
+            self.generation = int(value or 0)
+        return self.generation
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        if reading_own_writes.get():
+            # The client just wrote; an entry may have been filled from a
+            # replica that had not replayed the write yet.
+            self.stats["misses"] += 1
+            return None
+
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, cached = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["local_hits"] += 1
+                return cached
+            del self._local[key]
+
+        if self.shared is not None:
+            data = await self.shared.get(f"{self.namespace}:{key}")
+            if data is not None:
+                cached = CachedResponse.load(data)
+                self._store_local(key, cached)
+                self.stats["hits"] += 1
+                self.stats["shared_hits"] += 1
+                return cached
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, cached: CachedResponse):
+        self._store_local(key, cached)
+        if self.shared is not None:
+            await self.shared.set(f"{self.namespace}:{key}", cached.dump(), self.ttl)
+
+    def _store_local(self, key: str, cached: CachedResponse):
+        self._local[key] = (time.monotonic() + self.ttl, cached)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def invalidate(self):
+        if self.shared is not None:
+            self.generation = await self.shared.incr(f"{self.namespace}:generation")
+        else:
+            self.generation += 1
+        self._local.clear()
+        self.stats["invalidations"] += 1
+
+    def metrics(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._local),
+            "backend": CACHE_BACKEND or "local",
+        }
+
+
+def build_shared_backend():
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend(CACHE_URL)
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    return None
+
+
+listing_cache = ResponseCache(
+    namespace="listings-cache",
+    ttl=CACHE_TTL,
+    max_entries=CACHE_MAX_ENTRIES,
+    shared=build_shared_backend(),
+)
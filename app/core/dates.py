@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Query parameter datetime in the form the TIMESTAMP columns hold
+
+    Listing and history times are stored as naive UTC. Aware values ("...Z",
+    "+00:00") are converted to UTC and lose their offset; naive ones are taken
+    to be UTC already.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,30 @@
+import hashlib
+from typing import Optional
+
+
+def body_etag(body: bytes, next_cursor: Optional[str] = None) -> str:
+    """
+    Weak ETag for a serialized listing response
+
+    Hashing the body itself covers every returned column, including ones the
+    content hash leaves out such as posted_date, and any field selection. A
+    page's next cursor is part of it too. The tag is weak because the same
+    body is also sent gzip-encoded.
+    """
+    digest = hashlib.sha1(body)
+    digest.update((next_cursor or "").encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    opaque = etag.removeprefix("W/")
+    candidates = (
+        value.strip().removeprefix("W/") for value in if_none_match.split(",")
+    )
+    return opaque in candidates
@@ -0,0 +1,131 @@
+import csv
+import io
+from typing import AsyncIterator, List
+
+import orjson
+from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from app.db.models.listings import DATA_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet exports are optional
+    pa = None
+
+EXPORT_COLUMNS = [column.name for column in DATA_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+Batches = AsyncIterator[List[dict]]
+
+
+async def encode_json(batches: Batches) -> AsyncIterator[bytes]:
+    # A JSON array written one batch at a time, same shape as the old export.
+    yield b"["
+    separator = b""
+    async for batch in batches:
+        if batch:
+            yield separator + b",".join(orjson.dumps(row) for row in batch)
+            separator = b","
+    yield b"]"
+
+
+async def encode_ndjson(batches: Batches) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(orjson.dumps(row) + b"\n" for row in batch)
+
+
+def to_csv_value(value):
+    # JSONB features and amenity tag arrays are written as JSON text.
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+async def encode_csv(batches: Batches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow([to_csv_value(row[name]) for name in EXPORT_COLUMNS])
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands over its bytes as they are written."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_schema():
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, ARRAY):
+            return pa.list_(pa.string())
+        return pa.string()
+
+    return pa.schema([(column.name, arrow_type(column)) for column in DATA_COLUMNS])
+
+
+async def encode_parquet(batches: Batches) -> AsyncIterator[bytes]:
+    """Parquet file with one row group per batch, sent as each group is written."""
+    schema = parquet_schema()
+    json_columns = [
+        column.name for column in DATA_COLUMNS if isinstance(column.type, JSONB)
+    ]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in batches:
+            for row in batch:
+                for name in json_columns:
+                    if row[name] is not None:
+                        row[name] = orjson.dumps(row[name]).decode()
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "json": encode_json,
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "parquet": encode_parquet,
+}
@@ -0,0 +1,304 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import SLOW_QUERY_MS, SLOW_REQUEST_MS
+from app.dependencies.filters import declared_query_params
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Longest statement or parameter list written to the slow query log
+SLOW_LOG_MAX_CHARS = 2000
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter per label set, in Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            )
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram per label set, in Prometheus text format
+
+    Args:
+        name: Metric name
+        help: One-line description
+        labelnames: Names of the labels passed to `observe`
+        buckets: Upper bounds of the buckets, ascending; +Inf is implied
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def total(self) -> int:
+        """Observations across all label sets."""
+        return sum(sum(counts) for counts, _ in self._series.values())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = (*self.labelnames, "le")
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                label_str = _format_labels(names, (*labels, le))
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, including streaming the body",
+    ("method", "route", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run while serving a request",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent waiting on database queries",
+    ("method", "route"),
+)
+SLOW_REQUESTS = Counter(
+    "http_slow_requests_total",
+    f"Requests slower than {SLOW_REQUEST_MS:g}ms, by the query parameters they used",
+    ("method", "route", "params"),
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total", f"Database queries slower than {SLOW_QUERY_MS:g}ms"
+)
+
+STARTED_AT = time.time()
+
+
+class RequestQueries:
+    """Query count and database time of the request being served."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "current_queries", default=None
+)
+
+
+def _truncate(value) -> str:
+    text = str(value)
+    if len(text) > SLOW_LOG_MAX_CHARS:
+        return text[:SLOW_LOG_MAX_CHARS] + "..."
+    return text
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    queries = current_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.duration += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.0f}ms): {_truncate(statement)} "
+            f"| params={_truncate(parameters)}"
+        )
+
+
+def install_query_hooks():
+    """Time every query on every engine, including the async engines' sync cores."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def param_label(route, query_string: str) -> str:
+    """
+    Query parameter names of a request, as a bounded label value
+
+    Only names the route declares are listed. Any others (feature filters,
+    typos, cache busters) collapse into "other", so a client cannot create new
+    series by making up parameter names.
+    """
+    names = {part.split("=", 1)[0] for part in query_string.split("&")} - {""}
+    declared = (
+        declared_query_params(route) if isinstance(route, APIRoute) else frozenset()
+    )
+    label = sorted(names & declared)
+    if names - declared:
+        label.append("other")
+    return ",".join(label)
+
+
+class MetricsMiddleware:
+    """
+    Records latency and database work per route, and logs slow requests
+
+    Plain ASGI middleware rather than BaseHTTPMiddleware, so streamed
+    responses (exports) are timed until their last chunk is sent. Routes are
+    labelled by their path template, and unmatched paths share one label, to
+    keep the number of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_queries.reset(token)
+            self.record(scope, status, elapsed, queries)
+
+    @staticmethod
+    def record(scope, status: int, elapsed: float, queries: RequestQueries):
+        route = scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        method = scope["method"]
+        REQUEST_LATENCY.observe((method, path, str(status)), elapsed)
+        REQUEST_QUERIES.observe((method, path), queries.count)
+        REQUEST_DB_TIME.observe((method, path), queries.duration)
+
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            query_string = scope.get("query_string", b"").decode("latin-1")
+            SLOW_REQUESTS.inc((method, path, param_label(route, query_string)))
+            logger.warning(
+                f"Slow request ({elapsed * 1000:.0f}ms): {method} {scope['path']}"
+                f"{'?' + query_string if query_string else ''} - {queries.count} "
+                f"queries, {queries.duration * 1000:.0f}ms in the database"
+            )
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
+
+
+def render_gauges(name: str, help: str, labelname: str, values: dict) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for label, value in values.items():
+        lines.append(f'{name}{{{labelname}="{_escape(label)}"}} {value}')
+    return lines
+
+
+def render_metrics(pools: Dict[str, dict], cache: dict) -> str:
+    """All metrics in Prometheus text format, with pool and cache state as of now."""
+    lines = []
+    for metric in (
+        REQUEST_LATENCY,
+        REQUEST_QUERIES,
+        REQUEST_DB_TIME,
+        SLOW_REQUESTS,
+        SLOW_QUERIES,
+    ):
+        lines.extend(metric.render())
+    for field, help in (
+        ("checked_out", "Connections in use"),
+        ("overflow", "Connections opened beyond the pool size"),
+        ("idle", "Connections idle in the pool"),
+        ("size", "Configured pool size"),
+    ):
+        lines.extend(
+            render_gauges(
+                f"db_pool_{field}",
+                help,
+                "engine",
+                {engine: status[field] for engine, status in pools.items()},
+            )
+        )
+    for field in ("hits", "misses", "invalidations"):
+        lines.append(f"# TYPE listing_cache_{field}_total counter")
+        lines.append(f"listing_cache_{field}_total {cache[field]}")
+    lines.append("# TYPE listing_cache_entries gauge")
+    lines.append(f"listing_cache_entries {cache['entries']}")
+    lines.append("# TYPE process_start_time_seconds gauge")
+    lines.append(f"process_start_time_seconds {STARTED_AT}")
+    return "\n".join(lines) + "\n"
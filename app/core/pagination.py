@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(scraped_at: datetime, listing_pk: int) -> str:
+    """Opaque cursor pointing just after the given (scraped_at, id) sort key."""
+    payload = json.dumps([scraped_at.isoformat(), listing_pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        scraped_at, listing_pk = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(scraped_at), int(listing_pk)
+    except Exception:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,108 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import PREDICT_MAX_BATCH, PREDICT_MAX_WAIT_MS, PREDICT_MEMO_SIZE
+from src.utils.model_utils import ListingFeatures, PriceModel, latest_model_path
+
+LISTING_TYPES = ("rent", "sale")
+
+Prediction = Tuple[float, float, float]
+
+
+class PricePredictor:
+    """
+    Price predictions from models held in memory
+
+    Concurrent requests are scored together: the first request to find the
+    queue empty waits up to `max_wait` seconds for others, then the whole
+    batch goes through one matrix product (sooner if it reaches `max_batch`).
+    Results are memoized per (listing type, features) in an LRU, so repeated
+    questions skip the queue entirely.
+
+    Args:
+        max_batch: Requests scored in one batch at most
+        max_wait: Seconds a batch waits for more requests
+        memo_size: Predictions kept in the LRU
+    """
+
+    def __init__(self, max_batch: int, max_wait: float, memo_size: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.memo_size = memo_size
+        self.models: Dict[str, PriceModel] = {}
+        self._memo: OrderedDict = OrderedDict()
+        self._pending: List[Tuple[str, ListingFeatures, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"predictions": 0, "memo_hits": 0, "batches": 0}
+
+    def load(self):
+        """Load the newest artifact of each listing type; missing ones are skipped."""
+        for listing_type in LISTING_TYPES:
+            path = latest_model_path(listing_type)
+            if path is None:
+                logger.warning(f"No {listing_type} price model found, /predict is off")
+                continue
+            self.models[listing_type] = PriceModel.load(path)
+            logger.info(f"Loaded {listing_type} price model {path.name}")
+        self._memo.clear()
+
+    async def predict(self, listing_type: str, features: ListingFeatures) -> Prediction:
+        self.stats["predictions"] += 1
+        key = (listing_type, features)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            self.stats["memo_hits"] += 1
+            return self._memo[key]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((listing_type, features, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        self.stats["batches"] += 1
+
+        by_type: Dict[str, Dict[ListingFeatures, List[asyncio.Future]]] = {}
+        for listing_type, features, future in batch:
+            by_type.setdefault(listing_type, {}).setdefault(features, []).append(future)
+
+        for listing_type, waiting in by_type.items():
+            rows = list(waiting)
+            try:
+                results = self.models[listing_type].predict(rows)
+            except Exception as e:
+                for futures in waiting.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+            for features, result in zip(rows, results):
+                prediction = tuple(float(value) for value in result)
+                self._remember((listing_type, features), prediction)
+                for future in waiting[features]:
+                    if not future.done():
+                        future.set_result(prediction)
+
+    def _remember(self, key, prediction: Prediction):
+        self._memo[key] = prediction
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+
+price_predictor = PricePredictor(
+    max_batch=PREDICT_MAX_BATCH,
+    max_wait=PREDICT_MAX_WAIT_MS / 1000,
+    memo_size=PREDICT_MEMO_SIZE,
+)
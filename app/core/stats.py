@@ -0,0 +1,55 @@
+import asyncio
+import time
+from typing import Optional
+
+from loguru import logger
+
+from app.core.config import STATS_REFRESH_DELAY
+from app.crud.stats import refresh_listing_stats
+from app.db.session import async_engine
+
+
+class StatsRefresher:
+    """
+    Debounced refresh of the listing_stats and listing_feature_facets views
+
+    Writes call `schedule()`, which is cheap and never waits on the database.
+    The first call starts a background task that waits `delay` seconds, so a
+    burst of writes is folded into a single REFRESH ... CONCURRENTLY, which
+    does not block readers of the view. Writes landing while a refresh runs
+    trigger one more refresh afterwards.
+
+    Args:
+        delay: Seconds to wait for further writes before refreshing
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.last_refresh: Optional[float] = None
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            started = time.perf_counter()
+            try:
+                async with async_engine.begin() as conn:
+                    await refresh_listing_stats(conn)
+            except Exception as e:
+                # The next write schedules another attempt.
+                logger.warning(f"Refreshing listing_stats failed: {e}")
+            else:
+                self.last_refresh = time.time()
+                logger.debug(
+                    f"Refreshed listing_stats in {time.perf_counter() - started:.2f}s"
+                )
+
+
+stats_refresher = StatsRefresher(delay=STATS_REFRESH_DELAY)
@@ -3,6 +3,10 @@ tags_metadata = [
         "name": "Listings",
         "description": "Manage apartment listings.",
     },
+    {
+        "name": "Pricing",
+        "description": "Rental and sale price recommendations.",
+    },
     {
         "name": "Health",
         "description": "Health and status checks for API monitoring.",
@@ -1,75 +1,444 @@
-from typing import Optional
+import math
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    String,
+    and_,
+    any_,
+    bindparam,
+    func,
+    literal_column,
+    or_,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.db.models.listings import Listing
+from app.crud.stats import listing_feature_facets
+from app.db.models.listings import DATA_COLUMNS, Listing
 from app.schema.listings import ListingCreate, ListingUpdate
+from src.utils.amenity_utils import normalize_amenities
+from src.utils.geo_utils import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    covering_geohashes,
+    encode_geohash,
+)
+from src.utils.hash_utils import HASHED_FIELDS, compute_content_hash
 
+# Keeps each multi-row INSERT well below Postgres' 65535 bind parameter limit.
+UPSERT_BATCH_SIZE = 1000
 
-def create_listing(db: Session, data: ListingCreate):
-    existing = get_listing(db, data.listing_id)
+# Always loaded on list queries: the keyset cursor and the ETag are built from them.
+LIST_KEY_FIELDS = ("id", "listing_id", "scraped_at", "content_hash")
+
+# Rows fetched per round trip from the server-side cursor used for exports.
+EXPORT_BATCH_SIZE = 5000
+
+
+def derived_columns(record: dict) -> dict:
+    """Columns computed from a listing's own fields, refreshed on every write."""
+    latitude, longitude = record.get("latitude"), record.get("longitude")
+    has_coordinates = latitude is not None and longitude is not None
+    return {
+        "amenity_tags": normalize_amenities(record.get("amenities")),
+        "geohash": encode_geohash(latitude, longitude) if has_coordinates else None,
+    }
+
+
+async def create_listing(db: AsyncSession, data: ListingCreate):
+    existing = await get_listing(db, data.listing_id)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Listing with ID '{data.listing_id}' already exists.",
         )
     data_dict = data.model_dump()
+    data_dict["content_hash"] = compute_content_hash(data_dict)
+    data_dict.update(derived_columns(data_dict))
     db_obj = Listing(**data_dict)
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
     return db_obj
 
 
-def get_listing(db: Session, listing_id: str):
-    return db.query(Listing).filter(Listing.listing_id == listing_id).first()
+async def get_listing(db: AsyncSession, listing_id: str):
+    result = await db.execute(select(Listing).where(Listing.listing_id == listing_id))
+    return result.scalars().first()
 
 
-def get_all_listings(
-    db: Session,
-    skip: int = 0,
-    limit: int = 20,
+def apply_listing_filters(
+    query,
+    *,
     region: Optional[str] = None,
+    area: Optional[str] = None,
     min_price: Optional[int] = None,
     max_price: Optional[int] = None,
     listing_type: Optional[str] = None,
+    features: Optional[Dict[str, list]] = None,
+    amenities_all: Optional[List[str]] = None,
+    amenities_any: Optional[List[str]] = None,
 ):
-    query = db.query(Listing)
-
+    """Narrow a listings query by the filters shared by the list endpoints."""
     if region:
-        query = query.filter(Listing.region.ilike(f"%{region}%"))
+        query = query.where(Listing.region.ilike(f"%{region}%"))
+    if area:
+        query = query.where(Listing.area.ilike(f"%{area}%"))
     if min_price is not None:
-        query = query.filter(Listing.price >= min_price)
+        query = query.where(Listing.price >= min_price)
     if max_price is not None:
-        query = query.filter(Listing.price <= max_price)
+        query = query.where(Listing.price <= max_price)
+    if listing_type:
+        query = query.where(Listing.listing_type == listing_type)
+    if features:
+        # Single-valued keys go into one @> document, the cheapest probe of the
+        # jsonb_path_ops index; each multi-valued key adds an OR of probes.
+        required = {
+            key: values[0] for key, values in features.items() if len(values) == 1
+        }
+        if required:
+            query = query.where(Listing.features.contains(required))
+        for key, values in features.items():
+            if len(values) > 1:
+                query = query.where(
+                    or_(*[Listing.features.contains({key: value}) for value in values])
+                )
+    # @> and && on amenity_tags are answered by its GIN index.
+    if amenities_all:
+        query = query.where(Listing.amenity_tags.contains(amenities_all))
+    if amenities_any:
+        query = query.where(Listing.amenity_tags.overlap(amenities_any))
+    return query
+
+
+async def get_all_listings(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 20,
+    after: Optional[Tuple[datetime, int]] = None,
+    fields: Optional[List[str]] = None,
+    **filters,
+):
+    query = apply_listing_filters(select(Listing), **filters)
+    if fields:
+        # Only the requested columns are selected; the others, typically the
+        # large description, amenities and features, stay deferred and raise if
+        # touched instead of triggering a query per row.
+        names = dict.fromkeys([*LIST_KEY_FIELDS, *fields])
+        query = query.options(
+            load_only(*[getattr(Listing, name) for name in names], raiseload=True)
+        )
+
+    # Keyset pagination walks ix_listings_scraped_at_id from the cursor, so
+    # deep pages cost the same as the first one. skip remains for old clients.
+    if after:
+        query = query.where(tuple_(Listing.scraped_at, Listing.id) < tuple_(*after))
+    else:
+        query = query.offset(skip)
+
+    query = query.order_by(Listing.scraped_at.desc(), Listing.id.desc()).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def search_listings(
+    db: AsyncSession,
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    **filters,
+) -> List[Tuple[Listing, float]]:
+    """
+    Full-text search over title, amenities and description
+
+    `q` uses web search syntax: quoted phrases, OR and -excluded words. Matches
+    come from the GIN index on search_vector and are ranked with title hits
+    first, then amenities, then description.
+
+    Returns:
+        list: (listing, rank) pairs, best match first
+    """
+    tsquery = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank_cd(Listing.search_vector, tsquery).label("rank")
+    query = apply_listing_filters(
+        select(Listing, rank).where(Listing.search_vector.op("@@")(tsquery)),
+        **filters,
+    )
+    query = query.order_by(rank.desc(), Listing.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.all()
+
+
+def geohash_prefix_filter(prefix: str):
+    # Range form of LIKE 'prefix%' that the text_pattern_ops index serves even
+    # when the prefix arrives as a bound parameter.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(Listing.geohash.op("~>=~")(prefix), Listing.geohash.op("~<~")(upper))
+
+
+def distance_km(latitude: float, longitude: float):
+    """Great-circle distance in km from a point to each listing (haversine)."""
+    dlat = func.radians(Listing.latitude - latitude)
+    dlon = func.radians(Listing.longitude - longitude)
+    a = func.power(func.sin(dlat / 2), 2) + func.cos(math.radians(latitude)) * func.cos(
+        func.radians(Listing.latitude)
+    ) * func.power(func.sin(dlon / 2), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+async def get_nearby_listings(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: int = 20,
+    **filters,
+) -> List[Tuple[Listing, float]]:
+    """
+    Listings within `radius_km` of a point, nearest first
+
+    The circle's bounding box is covered by a few geohash cells, fetched with
+    prefix range scans on ix_listings_geohash; the exact distance is only
+    computed for listings in those cells.
+
+    Returns:
+        list: (listing, distance in km) pairs
+    """
+    min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, radius_km)
+    prefixes = covering_geohashes(min_lat, min_lon, max_lat, max_lon)
+    distance = distance_km(latitude, longitude)
+
+    query = apply_listing_filters(
+        select(Listing, distance.label("distance_km"))
+        .where(or_(*[geohash_prefix_filter(prefix) for prefix in prefixes]))
+        .where(Listing.latitude.between(min_lat, max_lat))
+        .where(Listing.longitude.between(min_lon, max_lon))
+        .where(distance <= radius_km),
+        **filters,
+    )
+    query = query.order_by(distance, Listing.id).limit(limit)
+    result = await db.execute(query)
+    return result.all()
+
+
+async def get_feature_facets(
+    db: AsyncSession,
+    keys: Optional[List[str]] = None,
+    facet_limit: int = 20,
+    **filters,
+) -> Dict[str, List[dict]]:
+    """
+    Count feature values over the listings matching the filters
+
+    Without filters other than listing_type, the counts are read from the
+    listing_feature_facets view instead of expanding every listing's features.
+    Otherwise only matching rows are expanded, so a selective filter set is
+    answered from the indexes rather than a scan of every listing's features.
+
+    Returns:
+        dict: feature key -> up to `facet_limit` {"value", "count"}, most common first
+    """
+    if any(value for name, value in filters.items() if name != "listing_type"):
+        matching = apply_listing_filters(
+            select(Listing.features).where(Listing.features.is_not(None)), **filters
+        ).subquery()
+        pairs = func.jsonb_each_text(matching.c.features).table_valued("key", "value")
+        counts = (
+            select(pairs.c.key, pairs.c.value, func.count().label("count"))
+            .select_from(matching.join(pairs, true()))
+            .where(pairs.c.value.is_not(None))
+            .group_by(pairs.c.key, pairs.c.value)
+        )
+        key_column = pairs.c.key
+    else:
+        counts = select(
+            listing_feature_facets.c.key,
+            listing_feature_facets.c.value,
+            listing_feature_facets.c.listings.label("count"),
+        ).where(
+            listing_feature_facets.c.listing_type == (filters.get("listing_type") or "")
+        )
+        key_column = listing_feature_facets.c.key
+    if keys:
+        counts = counts.where(
+            key_column == any_(bindparam("keys", keys, type_=ARRAY(String)))
+        )
+    counts = counts.subquery()
+
+    ranked = select(
+        counts.c.key,
+        counts.c.value,
+        counts.c.count,
+        func.row_number()
+        .over(partition_by=counts.c.key, order_by=counts.c.count.desc())
+        .label("position"),
+    ).subquery()
+    query = (
+        select(ranked.c.key, ranked.c.value, ranked.c.count)
+        .where(ranked.c.position <= facet_limit)
+        .order_by(ranked.c.key, ranked.c.position)
+    )
+    facets = {}
+    for key, value, count in (await db.execute(query)).all():
+        facets.setdefault(key, []).append({"value": value, "count": count})
+    return facets
+
+
+async def get_listing_hashes(
+    db: AsyncSession, listing_type: Optional[str] = None
+) -> dict:
+    query = select(Listing.listing_id, Listing.content_hash)
+    if listing_type:
+        query = query.where(Listing.listing_type == listing_type)
+    result = await db.execute(query)
+    return dict(result.all())
+
+
+async def stream_listings(
+    conn: AsyncConnection,
+    listing_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[List[dict]]:
+    """
+    Stream listings in batches through a server-side cursor
+
+    Only one batch is held in memory at a time, however large the table.
+
+    Args:
+        conn: Connection kept open for the whole stream
+        listing_type: Only export 'rent' or 'sale' listings
+        since: Only listings scraped at or after this time (naive UTC)
+        until: Only listings scraped before this time (naive UTC)
+        batch_size: Rows fetched from the cursor per round trip
+
+    Yields:
+        list: Listing rows as dicts, in id order
+    """
+    query = select(*DATA_COLUMNS).order_by(Listing.id)
     if listing_type:
-        query = query.filter(Listing.listing_type == listing_type)
+        query = query.where(Listing.listing_type == listing_type)
+    if since:
+        query = query.where(Listing.scraped_at >= since)
+    if until:
+        query = query.where(Listing.scraped_at < until)
 
-    return query.order_by(Listing.scraped_at.desc()).offset(skip).limit(limit).all()
+    result = await conn.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
 
 
-def update_listing(db: Session, listing_id: str, data: ListingUpdate):
-    db_obj = get_listing(db, listing_id)
+async def get_listings_by_ids(
+    db: AsyncSession, listing_ids: List[str], fields: Optional[List[str]] = None
+) -> List[dict]:
+    # One indexed lookup bound as a single array parameter, however many IDs.
+    columns = [
+        column
+        for column in DATA_COLUMNS
+        if column.name != "id" and (not fields or column.name in fields)
+    ]
+    if Listing.listing_id not in columns:
+        columns.insert(0, Listing.__table__.c.listing_id)
+
+    ids_param = bindparam("listing_ids", listing_ids, type_=ARRAY(String))
+    query = select(*columns).where(Listing.listing_id == any_(ids_param))
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
+
+
+async def update_listing(
+    db: AsyncSession, listing_id: str, data: ListingUpdate
+) -> Tuple[Listing, bool]:
+    """
+    Apply a partial update to a listing
+
+    Like the bulk upsert, the row is only written when its content hash
+    changes. Fields outside the hash, i.e. posted_date, which the cleaner
+    re-resolves on every run, are saved along with a content change but never
+    cause a write on their own.
+
+    Returns:
+        tuple: (listing, whether the row was written)
+    """
+    db_obj = await get_listing(db, listing_id)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
         )
 
-    for field, value in data.model_dump(exclude_unset=True).items():
+    updates = data.model_dump(exclude_unset=True)
+    current = {field: getattr(db_obj, field) for field in HASHED_FIELDS}
+    content_hash = compute_content_hash({**current, **updates})
+    if content_hash == db_obj.content_hash:
+        return db_obj, False
+
+    for field, value in updates.items():
+        setattr(db_obj, field, value)
+    db_obj.content_hash = content_hash
+    for field, value in derived_columns({**current, **updates}).items():
         setattr(db_obj, field, value)
 
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj, True
 
 
-def delete_listing(db: Session, listing_id: str):
-    db_obj = get_listing(db, listing_id)
+async def delete_listing(db: AsyncSession, listing_id: str):
+    db_obj = await get_listing(db, listing_id)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
         )
 
-    db.delete(db_obj)
-    db.commit()
+    await db.delete(db_obj)
+    await db.commit()
+
+
+def on_conflict_update(stmt, columns: List[str]):
+    """
+    Turn an INSERT into listings into an upsert keyed on listing_id that only
+    touches rows whose content_hash changed, so `columns` must include it.
+    RETURNING yields one row per created or updated listing; listings missing
+    from the result were unchanged.
+    """
+    update_cols = {col: stmt.excluded[col] for col in columns if col != "listing_id"}
+    return stmt.on_conflict_do_update(
+        index_elements=[Listing.listing_id],
+        set_=update_cols,
+        where=Listing.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    ).returning(Listing.listing_id, (literal_column("xmax") == 0).label("created"))
+
+
+def build_upsert_statement(rows: List[dict]):
+    return on_conflict_update(insert(Listing).values(rows), list(rows[0]))
+
+
+async def upsert_listings(
+    db: AsyncSession, listings: List[ListingCreate]
+) -> List[dict]:
+    # Postgres rejects a statement that touches the same row twice, so the last
+    # occurrence of a duplicated listing_id wins.
+    rows = {item.listing_id: item.model_dump() for item in listings}
+    for row in rows.values():
+        row["content_hash"] = compute_content_hash(row)
+        row.update(derived_columns(row))
+    statuses = dict.fromkeys(rows, "unchanged")
+
+    batch = list(rows.values())
+    for start in range(0, len(batch), UPSERT_BATCH_SIZE):
+        stmt = build_upsert_statement(batch[start : start + UPSERT_BATCH_SIZE])
+        for listing_id, created in await db.execute(stmt):
+            statuses[listing_id] = "created" if created else "updated"
+
+    await db.commit()
+    return [
+        {"listing_id": listing_id, "status": status_}
+        for listing_id, status_ in statuses.items()
+    ]
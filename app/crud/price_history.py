@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import column, select, table
+
+# Append-only table created by migration 5e1b9d7c3a60 and written by triggers
+# on listings: one row per new listing price and per price change. It is
+# partitioned by month on changed_at, so queries bounded on changed_at only
+# scan the months they cover.
+listing_price_history = table(
+    "listing_price_history",
+    column("listing_id"),
+    column("listing_type"),
+    column("area"),
+    column("bedrooms"),
+    column("price"),
+    column("previous_price"),
+    column("changed_at"),
+)
+
+
+async def get_price_trends(
+    db: AsyncSession,
+    since: datetime,
+    until: datetime,
+    interval: str = "month",
+    area: Optional[str] = None,
+    bedrooms: Optional[int] = None,
+    listing_type: Optional[str] = None,
+    min_observations: int = 1,
+) -> List[dict]:
+    """
+    Median observed price per period, area and bedroom count
+
+    Args:
+        since, until: Half-open date range; bounds the partitions scanned
+        interval: date_trunc unit of the periods ('week' or 'month')
+
+    Returns:
+        list: Rows ordered by area, bedrooms and period
+    """
+    history = listing_price_history.c
+    period = func.date_trunc(interval, history.changed_at).label("period")
+    observations = func.count().label("observations")
+    query = (
+        select(
+            history.area,
+            history.bedrooms,
+            period,
+            func.percentile_cont(0.5).within_group(history.price).label("median_price"),
+            func.min(history.price).label("price_min"),
+            func.max(history.price).label("price_max"),
+            observations,
+        )
+        .where(history.changed_at >= since)
+        .where(history.changed_at < until)
+        .group_by(history.area, history.bedrooms, period)
+        .having(func.count() >= min_observations)
+        .order_by(history.area, history.bedrooms, period)
+    )
+    if area:
+        query = query.where(history.area.ilike(f"%{area}%"))
+    if bedrooms is not None:
+        query = query.where(history.bedrooms == bedrooms)
+    if listing_type:
+        query = query.where(history.listing_type == listing_type)
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+from sqlalchemy import text, true
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import column, func, select, table
+
+# Materialized view created by migration 3d7b1e9c5a24. Dimension 'all' holds
+# the totals; listing_type '' aggregates rent and sale together.
+listing_stats = table(
+    "listing_stats",
+    column("listing_type"),
+    column("dimension"),
+    column("value"),
+    column("listings"),
+    column("priced_listings"),
+    column("price_min"),
+    column("price_p25"),
+    column("price_median"),
+    column("price_p75"),
+    column("price_p90"),
+    column("price_max"),
+    column("price_mean"),
+)
+
+# Materialized view created by migration a6c4e2f8b913: feature value counts
+# over all listings, per listing_type and ('') across both.
+listing_feature_facets = table(
+    "listing_feature_facets",
+    column("listing_type"),
+    column("key"),
+    column("value"),
+    column("listings"),
+)
+
+# Single row holding when listing_stats was last refreshed, kept out of the
+# view so a refresh only rewrites the groups that changed.
+listing_stats_refresh = table("listing_stats_refresh", column("refreshed_at"))
+
+REFRESH_STATS = text("REFRESH MATERIALIZED VIEW CONCURRENTLY listing_stats")
+REFRESH_FACETS = text("REFRESH MATERIALIZED VIEW CONCURRENTLY listing_feature_facets")
+STAMP_REFRESH = listing_stats_refresh.update().values(refreshed_at=func.now())
+
+
+async def get_listing_stats(
+    db: AsyncSession,
+    listing_type: Optional[str] = None,
+    dimension: str = "all",
+    value: Optional[str] = None,
+    min_listings: int = 1,
+) -> List[dict]:
+    query = (
+        select(listing_stats, listing_stats_refresh.c.refreshed_at)
+        .select_from(listing_stats.join(listing_stats_refresh, true()))
+        .where(listing_stats.c.dimension == dimension)
+        .where(listing_stats.c.listings >= min_listings)
+        .order_by(listing_stats.c.listing_type, listing_stats.c.listings.desc())
+    )
+    if listing_type:
+        query = query.where(listing_stats.c.listing_type == listing_type)
+    if value is not None:
+        query = query.where(listing_stats.c.value == value)
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
+
+
+async def get_listing_counts(db: AsyncSession) -> dict:
+    """Listing totals per listing_type ('' for all types) from the stats view."""
+    result = await db.execute(
+        select(listing_stats.c.listing_type, listing_stats.c.listings).where(
+            listing_stats.c.dimension == "all"
+        )
+    )
+    return dict(result.all())
+
+
+async def refresh_listing_stats(conn: AsyncConnection):
+    await conn.execute(REFRESH_STATS)
+    await conn.execute(REFRESH_FACETS)
+    await conn.execute(STAMP_REFRESH)
@@ -1,11 +1,59 @@
-from sqlalchemy import TIMESTAMP, Column, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    TIMESTAMP,
+    Column,
+    Computed,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 
 from app.db.base import Base
 
+# Titles weigh most in search ranking, then amenities, then descriptions.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(amenities, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        Index("ix_listings_scraped_at_id", "scraped_at", "id"),
+        Index("ix_listings_type_scraped_at_id", "listing_type", "scraped_at", "id"),
+        Index("ix_listings_type_price", "listing_type", "price"),
+        Index(
+            "ix_listings_region_trgm",
+            "region",
+            postgresql_using="gin",
+            postgresql_ops={"region": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_listings_area_trgm",
+            "area",
+            postgresql_using="gin",
+            postgresql_ops={"area": "gin_trgm_ops"},
+        ),
+        Index("ix_listings_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_listings_amenity_tags", "amenity_tags", postgresql_using="gin"),
+        Index(
+            "ix_listings_geohash",
+            "geohash",
+            postgresql_ops={"geohash": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_listings_features",
+            "features",
+            postgresql_using="gin",
+            postgresql_ops={"features": "jsonb_path_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     listing_id = Column(String, unique=True, nullable=False, index=True)
@@ -15,11 +63,26 @@ class Listing(Base):
     price = Column(Integer)
     region = Column(String)
     area = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    # Derived from latitude/longitude (src/utils/geo_utils.py) for prefix scans
+    geohash = Column(String(12))
     bedrooms = Column(Integer)
     bathrooms = Column(Integer)
     house_type = Column(String)
     posted_date = Column(TIMESTAMP, index=True)
     amenities = Column(Text)
+    # Canonical tags derived from amenities (src/utils/amenity_utils.py)
+    amenity_tags = Column(ARRAY(Text))
     description = Column(Text)
     features = Column(JSONB)
     scraped_at = Column(TIMESTAMP, server_default=func.now())
+    content_hash = Column(String(64))
+    # Maintained by Postgres on insert and update; never loaded with listings.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)))
+
+
+# Columns holding listing data, without the ones Postgres derives from them.
+DATA_COLUMNS = [
+    column for column in Listing.__table__.columns if column.computed is None
+]
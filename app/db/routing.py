@@ -0,0 +1,128 @@
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+from fastapi import Request, Response
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import READ_YOUR_WRITES, REPLICA_RETRY
+from app.db.session import (
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    async_engine,
+    read_engine,
+)
+
+# Write responses carry the time of the write in a header and a cookie.
+# Clients that send either back read from the primary for a few seconds.
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+
+# Set for requests from a client that wrote recently. The response cache skips
+# lookups for them, since an entry may have been filled from a lagging replica.
+reading_own_writes: ContextVar[bool] = ContextVar("reading_own_writes", default=False)
+
+
+class ReadRouter:
+    """
+    Sends reads to the replica unless the primary is the safer choice
+
+    Reads fall back to the primary when no replica is configured and for
+    `retry_after` seconds after the replica failed to connect. Read-your-writes
+    is per client: a write hands the client its write time, and requests that
+    send it back within `read_your_writes` seconds read from the primary, so
+    the client does not read back a replica that has not replayed its write.
+    Everyone else keeps reading from the replica.
+
+    Args:
+        read_your_writes: Seconds a client's reads stay on the primary after
+            its write
+        retry_after: Seconds to wait before trying a failed replica again
+    """
+
+    def __init__(self, read_your_writes: float, retry_after: float):
+        self.read_your_writes = read_your_writes
+        self.retry_after = retry_after
+        self.replica_down_until = float("-inf")
+
+    @property
+    def has_replica(self) -> bool:
+        return read_engine is not async_engine
+
+    def record_write(self, response: Response):
+        if self.read_your_writes <= 0:
+            return
+        written_at = f"{time.time():.3f}"
+        response.headers[LAST_WRITE_HEADER] = written_at
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            written_at,
+            max_age=math.ceil(self.read_your_writes),
+            httponly=True,
+            samesite="lax",
+        )
+
+    def wrote_recently(self, request: Request) -> bool:
+        value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(
+            LAST_WRITE_COOKIE
+        )
+        try:
+            written_at = float(value)
+        except (TypeError, ValueError):
+            return False
+        # Bounded on both sides, so a skewed or made-up time cannot keep a
+        # client on the primary for longer than read_your_writes.
+        return abs(time.time() - written_at) < self.read_your_writes
+
+    def use_replica(self, own_writes: bool = False) -> bool:
+        return (
+            self.has_replica
+            and not own_writes
+            and time.monotonic() >= self.replica_down_until
+        )
+
+    def replica_failed(self, error: Exception):
+        self.replica_down_until = time.monotonic() + self.retry_after
+        logger.warning(
+            f"Read replica unavailable, reading from the primary for "
+            f"{self.retry_after:.0f}s: {error}"
+        )
+
+    @asynccontextmanager
+    async def session(self, own_writes: bool = False) -> AsyncIterator[AsyncSession]:
+        if self.use_replica(own_writes):
+            async with ReadSessionLocal() as db:
+                try:
+                    # Check out a connection now, so a dead replica falls
+                    # back here rather than failing the request's query.
+                    await db.connection()
+                except (DBAPIError, OSError) as e:
+                    self.replica_failed(e)
+                else:
+                    yield db
+                    return
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    @asynccontextmanager
+    async def connect(self, own_writes: bool = False) -> AsyncIterator[AsyncConnection]:
+        if self.use_replica(own_writes):
+            try:
+                conn = await read_engine.connect()
+            except (DBAPIError, OSError) as e:
+                self.replica_failed(e)
+            else:
+                try:
+                    yield conn
+                finally:
+                    await conn.close()
+                return
+        async with async_engine.connect() as conn:
+            yield conn
+
+
+read_router = ReadRouter(read_your_writes=READ_YOUR_WRITES, retry_after=REPLICA_RETRY)
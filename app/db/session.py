@@ -1,7 +1,44 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import database_url
+from app.core.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    async_database_url,
+    async_read_database_url,
+    database_url,
+)
 
+# Sync engine for the pipeline (publish_db) and scripts
 engine = create_engine(database_url)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _create_api_engine(url: str):
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+# Async engine serving the API
+async_engine = _create_api_engine(async_database_url)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Read-only engine for GET endpoints; the primary when no replica is configured
+read_engine = (
+    _create_api_engine(async_read_database_url)
+    if async_read_database_url
+    else async_engine
+)
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, autoflush=False, expire_on_commit=False
+)
@@ -1,9 +1,17 @@
-from app.db.session import SessionLocal
+from fastapi import Request
 
+from app.db.routing import read_router, reading_own_writes
+from app.db.session import AsyncSessionLocal
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Session for GET endpoints: the read replica when it is safe to use."""
+    own_writes = read_router.wrote_recently(request)
+    reading_own_writes.set(own_writes)
+    async with read_router.session(own_writes) as db:
         yield db
-    finally:
-        db.close()
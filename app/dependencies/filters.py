@@ -0,0 +1,83 @@
+import re
+from typing import Dict, List, Literal, Optional, Union
+
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+
+from app.schema.listings import AMENITY_TAG
+
+# Feature filters are spelled feature.<key>=<value>; other unknown query
+# parameters (page=, cache busters such as _=) are ignored like in any route.
+FEATURE_PREFIX = "feature."
+
+# Keys written by the scraper's feature parser: lowercase words joined by "_".
+FEATURE_KEY = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+def parse_feature_value(value: str) -> Union[int, str]:
+    # parse_features stores numeric values as ints, so match them as ints too.
+    return int(value) if value.isdigit() else value
+
+
+# Query parameters each route declares, including those of its dependencies
+_declared_params: Dict[str, frozenset] = {}
+
+
+def declared_query_params(route: APIRoute) -> frozenset:
+    if route.unique_id not in _declared_params:
+        dependant = get_flat_dependant(route.dependant)
+        _declared_params[route.unique_id] = frozenset(
+            param.alias for param in dependant.query_params
+        )
+    return _declared_params[route.unique_id]
+
+
+def feature_filters(request: Request) -> Dict[str, List[Union[int, str]]]:
+    """
+    Feature filters from the feature.<key> query parameters
+
+    `?feature.furnishing=Furnished&feature.parking_space=Yes` becomes
+    {"furnishing": ["Furnished"], "parking_space": ["Yes"]}. Repeating a key
+    accepts any of its values.
+    """
+    filters = {}
+    for param, value in request.query_params.multi_items():
+        if not param.startswith(FEATURE_PREFIX):
+            continue
+        key = param.removeprefix(FEATURE_PREFIX)
+        if not FEATURE_KEY.match(key):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid feature filter: '{key}'"
+            )
+        filters.setdefault(key, []).append(parse_feature_value(value))
+    return filters
+
+
+def listing_filters(
+    region: Optional[str] = None,
+    area: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    listing_type: Optional[Literal["rent", "sale"]] = Query(
+        None, description="Only allow 'rent' or 'sale'"
+    ),
+    amenities_all: Optional[List[AMENITY_TAG]] = Query(
+        None, description="Listings with every one of these amenities"
+    ),
+    amenities_any: Optional[List[AMENITY_TAG]] = Query(
+        None, description="Listings with at least one of these amenities"
+    ),
+    features: Dict[str, list] = Depends(feature_filters),
+) -> dict:
+    """Filters shared by the list endpoints, as keyword arguments for the CRUD layer."""
+    return {
+        "region": region,
+        "area": area,
+        "min_price": min_price,
+        "max_price": max_price,
+        "listing_type": listing_type,
+        "amenities_all": sorted(set(amenities_all)) if amenities_all else None,
+        "amenities_any": sorted(set(amenities_any)) if amenities_any else None,
+        "features": features,
+    }
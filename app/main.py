@@ -1,10 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 
-from app.api.v1.endpoints import listings, meta
+from app.api.v1.endpoints import listings, meta, pricing
+from app.api.v1.endpoints.health import metrics_router
 from app.api.v1.endpoints.health import router as health_router
+from app.core.metrics import MetricsMiddleware, install_query_hooks
+from app.core.predictor import price_predictor
 from app.core.tags import tags_metadata
 from src.utils.settings import settings
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Price models are read from disk once, not per request.
+    price_predictor.load()
+    yield
+
+
 app = FastAPI(
     title="Smart Rental Pricing API",
     description="Backend API for inserting and retrieving real estate listings in Ghana.",
@@ -13,8 +27,18 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
+# Listing pages carry long descriptions and features; small bodies are not
+# worth the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Outermost, so timings include compression
+app.add_middleware(MetricsMiddleware)
+install_query_hooks()
+
 app.include_router(listings.router, prefix="/api/v1", tags=["Listings"])
 app.include_router(meta.router, prefix="/api/v1", tags=["Meta"])
+app.include_router(pricing.router, prefix="/api/v1", tags=["Pricing"])
 app.include_router(health_router, prefix="/api/v1/health", tags=["Health"])
+app.include_router(metrics_router, tags=["Health"])
@@ -1,7 +1,11 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.utils.amenity_utils import AMENITY_VOCABULARY
+
+AMENITY_TAG = Literal[tuple(AMENITY_VOCABULARY)]
 
 
 class ListingBase(BaseModel):
@@ -9,6 +13,8 @@ class ListingBase(BaseModel):
     price: Optional[int] = Field(None, gt=0, example=2500)
     region: Optional[str] = Field(None, example="Greater Accra")
     area: Optional[str] = Field(None, example="East Legon")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, example=5.635)
+    longitude: Optional[float] = Field(None, ge=-180, le=180, example=-0.16)
     bedrooms: Optional[int] = Field(None, example=2)
     bathrooms: Optional[int] = Field(None, example=1)
     house_type: Optional[str] = Field(None, example="Apartment")
@@ -29,6 +35,9 @@ class ListingShort(BaseModel):
     posted_date: Optional[datetime]
 
 
+SHORT_FIELDS = list(ListingShort.model_fields)
+
+
 class ListingCreate(ListingBase):
     listing_id: str
     listing_type: Optional[str]
@@ -41,6 +50,99 @@ class ListingUpdate(ListingBase):
 
 class ListingOut(ListingCreate):
     scraped_at: Optional[datetime]
+    content_hash: Optional[str] = None
+    amenity_tags: Optional[List[str]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ListingSearchOut(ListingOut):
+    rank: float
+
+
+class ListingNearbyOut(ListingOut):
+    distance_km: float
+
+
+MAX_LOOKUP_IDS = 5000
+
+LOOKUP_FIELDS = Literal[
+    "listing_id",
+    "listing_type",
+    "url",
+    "title",
+    "price",
+    "region",
+    "area",
+    "latitude",
+    "longitude",
+    "bedrooms",
+    "bathrooms",
+    "house_type",
+    "posted_date",
+    "amenities",
+    "amenity_tags",
+    "description",
+    "features",
+    "scraped_at",
+    "content_hash",
+]
+
+
+class ListingLookup(BaseModel):
+    listing_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_LOOKUP_IDS, example=["abcd1234"]
+    )
+    fields: Optional[List[LOOKUP_FIELDS]] = Field(None, example=["price", "title"])
+    hashes_only: bool = False
+
+
+class ListingLookupOut(BaseModel):
+    found: List[Dict[str, Any]]
+    missing: List[str]
+
+
+class ListingUpsertResult(BaseModel):
+    listing_id: str
+    status: Literal["created", "updated", "unchanged"]
+
+
+class BulkUpsertOut(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    results: List[ListingUpsertResult]
+
+
+class FeatureFacet(BaseModel):
+    value: str
+    count: int
+
+
+STATS_DIMENSIONS = Literal["all", "region", "area", "bedrooms", "house_type"]
+
+
+class ListingStatsOut(BaseModel):
+    listing_type: str
+    dimension: str
+    value: str
+    listings: int
+    priced_listings: int
+    price_min: Optional[int]
+    price_p25: Optional[float]
+    price_median: Optional[float]
+    price_p75: Optional[float]
+    price_p90: Optional[float]
+    price_max: Optional[int]
+    price_mean: Optional[float]
+    refreshed_at: datetime
+
 
-    class Config:
-        orm_mode = True
+class PriceTrendOut(BaseModel):
+    area: Optional[str]
+    bedrooms: Optional[int]
+    period: datetime
+    median_price: float
+    price_min: int
+    price_max: int
+    observations: int
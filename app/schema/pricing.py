@@ -0,0 +1,23 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PriceRequest(BaseModel):
+    listing_type: Literal["rent", "sale"] = "rent"
+    area: str = Field(..., example="East Legon")
+    bedrooms: Optional[int] = Field(None, ge=0, example=2)
+    bathrooms: Optional[int] = Field(None, ge=0, example=2)
+    house_type: Optional[str] = Field(None, example="Apartment")
+    furnishing: Optional[str] = Field(None, example="Furnished")
+    amenities: List[str] = Field(
+        default_factory=list, example=["Air Conditioning", "swimming_pool"]
+    )
+
+
+class PricePrediction(BaseModel):
+    listing_type: str
+    predicted_price: int
+    price_low: int = Field(..., description="10th percentile of the estimate")
+    price_high: int = Field(..., description="90th percentile of the estimate")
+    model_version: str
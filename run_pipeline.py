@@ -6,10 +6,22 @@ from loguru import logger
 
 from src.cleaner.cleaner import run_cleaner
 from src.publisher.publisher_api import run_publisher_api
+from src.publisher.publisher_async import run_publisher_async
+from src.publisher.replay import run_replay_failed
 from src.scraper.scraper import run_scraper, trigger_airflow_dag
+from src.trainer.trainer import run_trainer
 from src.utils.publisher_utils import get_latest_scraped_file
 from src.utils.settings import CLEANED_DIR, LOG_DIR, RAW_DIR
 
+
+def run_publisher_db(**kwargs):
+    # publish_db builds on the API's models and statement builders. The app
+    # package is not shipped to the Airflow images, so import it on demand.
+    from src.publisher.publisher_db import run_publisher_db as publish_db
+
+    return publish_db(**kwargs)
+
+
 # -------------------------
 # Step mapping dictionary
 # -------------------------
@@ -17,9 +29,18 @@ VALID_STEPS = {
     "scrape": run_scraper,
     "clean": run_cleaner,
     "publish_api": run_publisher_api,
+    "publish_db": run_publisher_db,
+    "replay_failed": run_replay_failed,
+    "train": run_trainer,
     "trigger-dag": trigger_airflow_dag,
 }
 
+# Engines available to the publish_api step
+PUBLISH_ENGINES = {
+    "threads": run_publisher_api,
+    "async": run_publisher_async,
+}
+
 
 # -------------------------
 # Setup logging
@@ -50,7 +71,7 @@ def parse_arguments():
 
     parser.add_argument(
         "--step",
-        choices=["scrape", "clean", "publish_api", "trigger-dag"],
+        choices=list(VALID_STEPS),
         required=True,
         help="Pipeline step to execute.",
     )
@@ -66,12 +87,36 @@ def parse_arguments():
         default=os.cpu_count(),
         help="Number of threads for publishing to API.",
     )
+    parser.add_argument(
+        "--engine",
+        choices=list(PUBLISH_ENGINES),
+        default="threads",
+        help="Publishing engine for the publish_api step.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=200,
+        help="Maximum in-flight requests for the async publishing engine.",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune async publishing concurrency from API latency and errors, \
+        using --concurrency as the upper bound.",
+    )
     parser.add_argument(
         "--limit",
         type=int,
         default=None,
         help="Limit number of listings to publish.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Listings per bulk request when replaying failed publishes.",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -102,12 +147,29 @@ def prepare_step_parameters(args):
 
     elif args.step == "publish_api":
         cleaned_file = get_latest_scraped_file(CLEANED_DIR, args.listing_type)
+        if args.engine == "async":
+            return {
+                "file": cleaned_file,
+                "concurrency": args.concurrency,
+                "limit": args.limit,
+                "adaptive": args.adaptive,
+            }
         return {
             "file": cleaned_file,
             "threads": args.threads,
             "limit": args.limit,
         }
 
+    elif args.step == "publish_db":
+        cleaned_file = get_latest_scraped_file(CLEANED_DIR, args.listing_type)
+        return {"file": cleaned_file, "limit": args.limit}
+
+    elif args.step == "replay_failed":
+        return {"batch_size": args.batch_size}
+
+    elif args.step == "train":
+        return {"listing_type": args.listing_type}
+
     elif args.step == "trigger-dag":
         # For triggering the Airflow DAG with S3 paths
         s3_paths = {}
@@ -143,6 +205,8 @@ def main_pipeline(args):
 
     try:
         step_function = VALID_STEPS[step]
+        if step == "publish_api":
+            step_function = PUBLISH_ENGINES[args.engine]
         step_params = prepare_step_parameters(args)
 
         logger.info(f"Starting '{step}' step for {args.listing_type}...")
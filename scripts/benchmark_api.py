@@ -0,0 +1,105 @@
+"""
+Micro-benchmark for the listings API
+
+Keeps a fixed number of requests in flight against one endpoint for a
+fixed duration and reports requests/sec and latency percentiles. Run the
+API with CACHE_TTL=0 to measure the query and serialization path instead
+of the response cache.
+
+    CACHE_TTL=0 uvicorn app.main:app --port 8000
+    python scripts/benchmark_api.py --path "/listings?limit=100" --duration 10
+
+With --body, requests are POSTs of that JSON document instead:
+
+    python scripts/benchmark_api.py --path /predict --body '{"area": "Osu"}'
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    url: str,
+    deadline: float,
+    results,
+    body: Optional[dict] = None,
+):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if body is None:
+                response = await client.get(url)
+            else:
+                response = await client.post(url, json=body)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        results.append((time.perf_counter() - started, ok))
+
+
+async def run_benchmark(
+    url: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    body: Optional[dict] = None,
+):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        if warmup:
+            await asyncio.gather(
+                *[
+                    worker(client, url, time.perf_counter() + warmup, [], body)
+                    for _ in range(concurrency)
+                ]
+            )
+
+        results = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *[worker(client, url, deadline, results, body) for _ in range(concurrency)]
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(not ok for _, ok in results)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{'GET' if body is None else 'POST'} {url}")
+    print(f"  requests   {len(results)} in {elapsed:.1f}s ({errors} errors)")
+    print(f"  throughput {len(results) / elapsed:.1f} req/s")
+    print(
+        f"  latency    p50 {quantiles[49] * 1000:.1f}ms  "
+        f"p95 {quantiles[94] * 1000:.1f}ms  p99 {quantiles[98] * 1000:.1f}ms"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark a listings API endpoint.")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--path", default="/listings?limit=100")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--body", help="JSON document to POST instead of a GET")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(
+        run_benchmark(
+            args.base_url + args.path,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+            json.loads(args.body) if args.body else None,
+        )
+    )
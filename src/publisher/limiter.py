@@ -0,0 +1,123 @@
+import asyncio
+import math
+import statistics
+import time
+from collections import deque
+
+from loguru import logger
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed latency and overload errors
+
+    Every `window` completed requests (or `limit` requests, whichever is larger,
+    so each adjustment sees a full round of traffic) the limiter compares the
+    window's median latency with a baseline: the best median of the last
+    `baseline_windows` windows. While latency stays within `tolerance` times
+    the baseline and overload errors stay under `error_threshold`, the limit
+    grows by sqrt(limit); otherwise it is multiplied by `backoff`. The limit
+    therefore settles just below the point where the API starts queueing
+    requests. Only 429s, 5xx responses and timeouts count as overload errors;
+    a listing the API rejects as invalid says nothing about its load.
+
+    Args:
+        initial: Starting number of requests allowed in flight
+        min_limit: Lower bound for the limit
+        max_limit: Upper bound for the limit
+        window: Minimum number of completed requests per adjustment
+        baseline_windows: Number of recent windows the baseline is taken from
+        tolerance: Allowed ratio between window latency and baseline latency
+        error_threshold: Overload error rate above which the limit is cut
+        backoff: Multiplier applied to the limit when cutting it
+        log_interval: Minimum seconds between INFO logs of the current limit
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 500,
+        window: int = 50,
+        baseline_windows: int = 100,
+        tolerance: float = 2.0,
+        error_threshold: float = 0.05,
+        backoff: float = 0.7,
+        log_interval: float = 5.0,
+    ):
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.error_threshold = error_threshold
+        self.backoff = backoff
+        self.log_interval = log_interval
+
+        self.in_flight = 0
+        self.baseline = None
+        self._medians = deque(maxlen=baseline_windows)
+        self.history = [(time.monotonic(), self.limit)]
+        self._latencies = []
+        self._errors = 0
+        self._last_log = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: float, overloaded: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            self._latencies.append(latency)
+            self._errors += overloaded
+            if len(self._latencies) >= max(self.window, self.limit):
+                self._adjust()
+            self._condition.notify_all()
+
+    def _adjust(self):
+        median = statistics.median(self._latencies)
+        error_rate = self._errors / len(self._latencies)
+        self._latencies = []
+        self._errors = 0
+
+        # A rolling minimum lets the baseline recover if the API gets slower
+        # for good, without drifting up while it is merely overloaded.
+        self._medians.append(median)
+        self.baseline = min(self._medians)
+
+        overloaded = (
+            error_rate > self.error_threshold or median > self.baseline * self.tolerance
+        )
+        if overloaded:
+            new_limit = int(self.limit * self.backoff)
+        else:
+            new_limit = self.limit + int(math.sqrt(self.limit))
+        new_limit = max(self.min_limit, min(new_limit, self.max_limit))
+
+        now = time.monotonic()
+        message = (
+            f"[CONCURRENCY] {self.limit} -> {new_limit} "
+            f"(p50 {median * 1000:.0f}ms, baseline {self.baseline * 1000:.0f}ms, "
+            f"errors {error_rate:.1%})"
+        )
+        if now - self._last_log >= self.log_interval:
+            logger.info(message)
+            self._last_log = now
+        else:
+            logger.debug(message)
+
+        if new_limit != self.limit:
+            self.limit = new_limit
+            self.history.append((now, new_limit))
+
+    def summary(self) -> dict:
+        limits = [limit for _, limit in self.history]
+        return {
+            "final": self.limit,
+            "min": min(limits),
+            "max": max(limits),
+            "adjustments": len(self.history) - 1,
+        }
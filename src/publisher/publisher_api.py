@@ -1,40 +1,74 @@
 import json
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import requests
 from loguru import logger
 
-from src.utils.settings import FAILED_DIR, settings
+from src.utils.hash_utils import compute_content_hash
+from src.utils.http_utils import PooledSession
+from src.utils.publisher_utils import DeadLetterLog
+from src.utils.settings import settings
 
 API_URL = settings.get("API_URL", "http://localhost:8000")
 
 
-def send_listing_to_api(data: dict) -> tuple[str, bool]:
+def build_publisher_session(threads: int) -> PooledSession:
+    return PooledSession(
+        pool_size=threads,
+        retries=settings.get("publisher_retries", 3),
+        backoff=settings.get("publisher_backoff", 0.5),
+        jitter=settings.get("publisher_backoff_jitter", 0.5),
+        timeout=settings.get("publisher_timeout", 10),
+    )
+
+
+def single_listing_type(listings: list[dict]) -> str | None:
+    # Snapshots hold one listing type, so only that type's hashes are needed.
+    listing_types = {listing.get("listing_type") for listing in listings}
+    return listing_types.pop() if len(listing_types) == 1 else None
+
+
+def hashes_params(listing_type: str | None) -> dict:
+    return {"listing_type": listing_type} if listing_type in ("rent", "sale") else {}
+
+
+def fetch_existing_hashes(
+    session: PooledSession, listing_type: str | None = None
+) -> dict[str, str]:
+    try:
+        response = session.get(
+            f"{API_URL}/listings/hashes", params=hashes_params(listing_type)
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.warning(f"Could not fetch existing hashes, publishing everything: {e}")
+        return {}
+
+
+def is_unchanged(listing: dict, existing_hashes: dict[str, str]) -> bool:
+    stored_hash = existing_hashes.get(listing.get("listing_id"))
+    return stored_hash is not None and stored_hash == compute_content_hash(listing)
+
+
+def send_listing_to_api(
+    session: PooledSession, data: dict
+) -> tuple[str, bool, str | None]:
     listing_id = data.get("listing_id")
     try:
-        put_resp = requests.put(f"{API_URL}/listing/{listing_id}", json=data)
+        put_resp = session.put(f"{API_URL}/listing/{listing_id}", json=data)
         if put_resp.status_code == 404:
-            post_resp = requests.post(f"{API_URL}/listing", json=data)
-            post_resp.raise_for_status()
+            post_resp = session.post(f"{API_URL}/listing", json=data)
+            if not post_resp.ok:
+                return listing_id, False, f"POST {post_resp.status_code}"
             logger.info(f"[CREATE] {listing_id}")
         elif put_resp.ok:
             logger.info(f"[UPDATE] {listing_id}")
         else:
-            return listing_id, False
-        return listing_id, True
-    except Exception:
-        return listing_id, False
-
-
-def write_failed_listing(listing: dict):
-    listing_id = listing.get("listing_id") or str(time.time())
-    listing_type = listing.get("listing_type")
-
-    FAILED_DIR.mkdir(parents=True, exist_ok=True)
-    with open(f"{FAILED_DIR}/{listing_type}_failed_{listing_id}.json", "w") as f:
-        json.dump(listing, f, indent=2)
+            return listing_id, False, f"PUT {put_resp.status_code}"
+        return listing_id, True, None
+    except Exception as e:
+        return listing_id, False, f"{type(e).__name__}: {e}"
 
 
 def run_publisher_api(file: str, threads: int, limit: int | None = None) -> bool:
@@ -53,21 +87,43 @@ def run_publisher_api(file: str, threads: int, limit: int | None = None) -> bool
         logger.warning("No listings to publish.")
         return False
 
-    logger.info(f"Publishing {len(listings)} listings with {threads} threads...")
-
     success_count = 0
+    session = build_publisher_session(threads)
 
-    with ThreadPoolExecutor(max_workers=threads) as executor:
+    existing_hashes = fetch_existing_hashes(session, single_listing_type(listings))
+    changed = [item for item in listings if not is_unchanged(item, existing_hashes)]
+    unchanged_count = len(listings) - len(changed)
+
+    logger.info(
+        f"Publishing {len(changed)} listings with {threads} threads "
+        f"({unchanged_count} unchanged skipped)..."
+    )
+
+    dead_letters = DeadLetterLog(input_path.stem)
+
+    with dead_letters, session, ThreadPoolExecutor(max_workers=threads) as executor:
         futures = {
-            executor.submit(send_listing_to_api, item): item for item in listings
+            executor.submit(send_listing_to_api, session, item): item
+            for item in changed
         }
         for future in as_completed(futures):
             listing = futures[future]
-            listing_id, success = future.result()
+            listing_id, success, reason = future.result()
             if success:
                 success_count += 1
             else:
-                write_failed_listing(listing)
-
-    logger.success(f"Published {success_count}/{len(listings)} listings")
+                dead_letters.write(
+                    listing, reason, stored_hash=existing_hashes.get(listing_id)
+                )
+
+        stats = session.stats()
+
+    logger.info(
+        f"HTTP: {stats['requests']} requests over {stats['connections']} connections "
+        f"({stats['reused']} reused), {stats['retries']} retries"
+    )
+    logger.success(
+        f"Published {success_count}/{len(changed)} changed listings, "
+        f"{unchanged_count} unchanged"
+    )
     return True
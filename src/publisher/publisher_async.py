@@ -0,0 +1,213 @@
+import asyncio
+import random
+import time
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable
+
+import httpx
+from loguru import logger
+
+from src.publisher.limiter import AdaptiveLimiter
+from src.publisher.publisher_api import API_URL, hashes_params, is_unchanged
+from src.utils.http_utils import RETRY_STATUSES
+from src.utils.publisher_utils import DeadLetterLog, iter_json_array
+from src.utils.settings import settings
+
+RETRIES = settings.get("publisher_retries", 3)
+BACKOFF = settings.get("publisher_backoff", 0.5)
+BACKOFF_JITTER = settings.get("publisher_backoff_jitter", 0.5)
+TIMEOUT = settings.get("publisher_timeout", 10)
+
+
+async def put_with_retries(
+    client: httpx.AsyncClient, url: str, data: dict
+) -> httpx.Response:
+    # PUT is idempotent, so transient failures are retried with exponential
+    # backoff plus jitter, mirroring the thread engine's session.
+    for attempt in range(RETRIES + 1):
+        try:
+            response = await client.put(url, json=data)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+        except httpx.TransportError:
+            if attempt == RETRIES:
+                raise
+        await asyncio.sleep(BACKOFF * 2**attempt + random.uniform(0, BACKOFF_JITTER))
+
+
+async def fetch_existing_hashes_async(
+    client: httpx.AsyncClient, listing_type: str | None = None
+) -> dict[str, str]:
+    try:
+        response = await client.get(
+            f"{API_URL}/listings/hashes", params=hashes_params(listing_type)
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.warning(f"Could not fetch existing hashes, publishing everything: {e}")
+        return {}
+
+
+def is_overload_status(status_code: int) -> bool:
+    # 429 and 5xx mean the API is struggling; other 4xx reject the listing.
+    return status_code == 429 or status_code >= 500
+
+
+async def send_listing_async(
+    client: httpx.AsyncClient, data: dict
+) -> tuple[str, bool, str | None, bool]:
+    """
+    Returns:
+        tuple: (listing_id, success, failure reason, whether the failure points
+        at an overloaded API: 429, 5xx, timeouts and connection errors)
+    """
+    listing_id = data.get("listing_id")
+    try:
+        put_resp = await put_with_retries(
+            client, f"{API_URL}/listing/{listing_id}", data
+        )
+        if put_resp.status_code == 404:
+            post_resp = await client.post(f"{API_URL}/listing", json=data)
+            if not post_resp.is_success:
+                status = post_resp.status_code
+                return listing_id, False, f"POST {status}", is_overload_status(status)
+            logger.info(f"[CREATE] {listing_id}")
+        elif put_resp.is_success:
+            logger.info(f"[UPDATE] {listing_id}")
+        else:
+            status = put_resp.status_code
+            return listing_id, False, f"PUT {status}", is_overload_status(status)
+        return listing_id, True, None, False
+    except httpx.TransportError as e:
+        return listing_id, False, f"{type(e).__name__}: {e}", True
+    except Exception as e:
+        return listing_id, False, f"{type(e).__name__}: {e}", False
+
+
+async def publish_listings_async(
+    listings: Iterable[dict],
+    concurrency: int,
+    dead_letters: DeadLetterLog,
+    adaptive: bool = False,
+) -> tuple[int, int, int]:
+    """
+    Publish listings with at most `concurrency` requests in flight
+
+    Records are pulled from `listings` only as slots free up, so a streamed
+    input is never fully materialised in memory. Listings whose content hash
+    matches the stored one are skipped without a request. With `adaptive`, the number
+    of slots is tuned at runtime by an AdaptiveLimiter and `concurrency` only
+    acts as its upper bound.
+
+    Args:
+        listings: Iterable of cleaned listing records
+        concurrency: Maximum number of listings being published at once
+        dead_letters: Log receiving the listings that could not be published
+        adaptive: Adjust the in-flight limit from observed latency and errors
+
+    Returns:
+        tuple: (listings published, listings attempted, unchanged listings skipped)
+    """
+    limiter = AdaptiveLimiter(max_limit=concurrency) if adaptive else None
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    pending = set()
+    success_count = 0
+    total = 0
+    unchanged_count = 0
+
+    async def publish(client: httpx.AsyncClient, listing: dict):
+        nonlocal success_count
+        started = time.perf_counter()
+        overloaded = False
+        try:
+            _, success, reason, overloaded = await send_listing_async(client, listing)
+            if success:
+                success_count += 1
+            else:
+                dead_letters.write(
+                    listing,
+                    reason,
+                    stored_hash=existing_hashes.get(listing.get("listing_id")),
+                )
+        finally:
+            if limiter:
+                await limiter.release(time.perf_counter() - started, overloaded)
+            else:
+                semaphore.release()
+
+    # The input is streamed, so the first record stands in for the snapshot's
+    # listing type. Listings of another type just miss the hashes and are sent.
+    listings = iter(listings)
+    first = next(listings, None)
+    if first is not None:
+        listings = chain([first], listings)
+    listing_type = first.get("listing_type") if first else None
+
+    async with httpx.AsyncClient(limits=limits, timeout=TIMEOUT) as client:
+        existing_hashes = await fetch_existing_hashes_async(client, listing_type)
+
+        for listing in listings:
+            if is_unchanged(listing, existing_hashes):
+                unchanged_count += 1
+                continue
+            if limiter:
+                await limiter.acquire()
+            else:
+                await semaphore.acquire()
+            total += 1
+            task = asyncio.create_task(publish(client, listing))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    if limiter:
+        summary = limiter.summary()
+        logger.info(
+            f"Concurrency settled at {summary['final']} "
+            f"(range {summary['min']}-{summary['max']}, "
+            f"{summary['adjustments']} adjustments)"
+        )
+
+    return success_count, total, unchanged_count
+
+
+def run_publisher_async(
+    file: str, concurrency: int, limit: int | None = None, adaptive: bool = False
+) -> bool:
+    input_path = Path(file)
+    if not input_path.exists():
+        logger.error(f"File not found: {input_path}")
+        return False
+
+    listings = iter_json_array(input_path)
+    if limit:
+        listings = islice(listings, limit)
+
+    mode = "adaptive" if adaptive else "fixed"
+    logger.info(
+        f"Publishing listings with up to {concurrency} requests in flight ({mode})..."
+    )
+
+    with DeadLetterLog(input_path.stem) as dead_letters:
+        success_count, total, unchanged_count = asyncio.run(
+            publish_listings_async(
+                listings, concurrency, dead_letters, adaptive=adaptive
+            )
+        )
+
+    if not total and not unchanged_count:
+        logger.warning("No listings to publish.")
+        return False
+
+    logger.success(
+        f"Published {success_count}/{total} changed listings, "
+        f"{unchanged_count} unchanged"
+    )
+    return True
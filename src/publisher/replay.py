@@ -0,0 +1,192 @@
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, TextIO
+
+import requests
+from loguru import logger
+
+from src.publisher.publisher_api import API_URL, build_publisher_session
+from src.utils.hash_utils import compute_content_hash
+from src.utils.http_utils import PooledSession
+from src.utils.publisher_utils import open_locked
+from src.utils.settings import FAILED_DIR
+
+
+def iter_dead_letters(f: TextIO) -> Iterator[dict]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+class ReplayAborted(Exception):
+    """
+    The API could not be reached or failed server-side; stop the run.
+
+    `unsent` holds the entries of the batch that must stay in the log: those
+    not sent yet and those that failed before the run stopped. None means the
+    whole batch.
+    """
+
+    def __init__(self, message: str, unsent: list[dict] | None = None):
+        super().__init__(message)
+        self.unsent = unsent
+
+
+def fetch_stored_hashes(session: PooledSession, listing_ids: list[str]) -> dict:
+    if not listing_ids:
+        return {}
+    try:
+        response = session.post(
+            f"{API_URL}/listings/lookup",
+            json={"listing_ids": listing_ids, "hashes_only": True},
+        )
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise ReplayAborted(f"POST /listings/lookup: {e}") from e
+    return {row["listing_id"]: row["content_hash"] for row in response.json()["found"]}
+
+
+def is_superseded(entry: dict, stored_hashes: dict) -> bool:
+    """
+    Whether the API already holds this listing or something newer
+
+    Entries record the hash the API held when their publish failed. If the
+    stored hash has moved on since, a later publish wrote the listing and
+    replaying the entry would overwrite newer data. Entries written before the
+    stored hash was recorded only replay when the listing is still missing.
+    """
+    listing_id = entry["listing"].get("listing_id")
+    stored = stored_hashes.get(listing_id)
+    if stored is None:
+        return False
+    if stored == compute_content_hash(entry["listing"]):
+        return True
+    return stored != entry.get("stored_hash")
+
+
+def replay_batch(session: PooledSession, entries: list[dict]) -> list[dict]:
+    """
+    Re-publish a batch of dead letters through the bulk upsert endpoint
+
+    If the API rejects the batch with a 4xx, its entries are retried one by one
+    so a single invalid listing does not keep the rest of the batch failing.
+    Connection errors and 5xx responses abort the run instead: they say nothing
+    about individual listings.
+
+    Returns:
+        list: Entries that still failed, with updated reason and attempt count
+
+    Raises:
+        ReplayAborted: The API is unreachable or failing
+    """
+    listings = [entry["listing"] for entry in entries]
+    try:
+        response = session.put(f"{API_URL}/listings", json=listings)
+    except requests.RequestException as e:
+        raise ReplayAborted(f"PUT /listings: {e}", entries) from e
+    if response.ok:
+        return []
+    if response.status_code >= 500:
+        raise ReplayAborted(f"PUT /listings {response.status_code}", entries)
+    reason = f"PUT /listings {response.status_code}"
+
+    if len(entries) > 1:
+        failed = []
+        for position, entry in enumerate(entries):
+            try:
+                failed.extend(replay_batch(session, [entry]))
+            except ReplayAborted as e:
+                # Entries replayed before the abort are published; drop them.
+                e.unsent = failed + entries[position:]
+                raise
+        return failed
+
+    return [
+        {
+            **entries[0],
+            "failed_at": datetime.utcnow().isoformat(),
+            "reason": reason,
+            "attempts": entries[0]["attempts"] + 1,
+        }
+    ]
+
+
+def compact_dead_letters(path: Path, remaining: list[dict]):
+    """
+    Rewrite a dead-letter log with only the entries that still fail
+
+    Must be called while holding the log's lock (open_locked).
+    """
+    if not remaining:
+        path.unlink()
+        return
+
+    tmp_path = path.with_suffix(".ndjson.tmp")
+    with open(tmp_path, "w") as f:
+        for entry in remaining:
+            f.write(json.dumps(entry, default=str) + "\n")
+    os.replace(tmp_path, path)
+
+
+def run_replay_failed(batch_size: int) -> bool:
+    logs = sorted(FAILED_DIR.glob("*_failed_*.ndjson"))
+    if not logs:
+        logger.warning(f"No dead-letter logs found in {FAILED_DIR}")
+        return True
+
+    replayed = still_failing = superseded = 0
+
+    with build_publisher_session(threads=1) as session:
+        for path in logs:
+            # A publisher that is still running holds the lock on its log, and
+            # the lock is kept until the log is compacted.
+            try:
+                f = open_locked(path, "r", blocking=False)
+            except FileNotFoundError:
+                continue
+            if f is None:
+                logger.info(f"{path.name}: still being written, skipped")
+                continue
+
+            with f:
+                entries = iter_dead_letters(f)
+                remaining = []
+                try:
+                    while batch := list(islice(entries, batch_size)):
+                        listing_ids = [
+                            entry["listing"].get("listing_id") for entry in batch
+                        ]
+                        stored_hashes = fetch_stored_hashes(
+                            session,
+                            [listing_id for listing_id in listing_ids if listing_id],
+                        )
+                        current = [
+                            entry
+                            for entry in batch
+                            if not is_superseded(entry, stored_hashes)
+                        ]
+                        superseded += len(batch) - len(current)
+                        if current:
+                            remaining.extend(replay_batch(session, current))
+                        replayed += len(current)
+                except ReplayAborted as e:
+                    # Keep what was not sent, what failed and the rest of the
+                    # log for the next run.
+                    remaining.extend(batch if e.unsent is None else e.unsent)
+                    remaining.extend(entries)
+                    compact_dead_letters(path, remaining)
+                    logger.error(f"Replay stopped, API unavailable: {e}")
+                    return False
+
+                compact_dead_letters(path, remaining)
+            still_failing += len(remaining)
+            logger.info(f"{path.name}: {len(remaining)} entries still failing")
+
+    logger.success(
+        f"Replayed {replayed} failed listings, {replayed - still_failing} published, "
+        f"{superseded} skipped as already stored or superseded"
+    )
+    return True
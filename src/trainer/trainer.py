@@ -0,0 +1,70 @@
+import re
+
+import numpy as np
+from loguru import logger
+
+from src.utils.model_utils import PriceModel, listing_features
+from src.utils.publisher_utils import iter_json_array
+from src.utils.settings import CLEANED_DIR
+
+# Fewer priced listings than this is not enough to fit a useful model
+MIN_TRAINING_LISTINGS = 30
+# Prices outside these percentiles are treated as scraping errors (placeholder
+# prices, totals typed as monthly rents) and left out of training
+PRICE_PERCENTILES = (1, 99)
+
+
+def load_training_listings(listing_type: str) -> dict:
+    """
+    Priced listings from every cleaned file of a listing type
+
+    Files are read oldest first, so a listing scraped several times is
+    trained on its latest version.
+    """
+    pattern = re.compile(rf"{listing_type}_(\d{{8}}_\d{{6}})\.json")
+    # Names end in a sortable timestamp: <type>_YYYYmmdd_HHMMSS.json
+    files = sorted(
+        path
+        for path in CLEANED_DIR.glob(f"{listing_type}_*.json")
+        if pattern.fullmatch(path.name)
+    )
+    listings = {}
+    for path in files:
+        for record in iter_json_array(path):
+            if record.get("listing_id") and (record.get("price") or 0) > 0:
+                listings[record["listing_id"]] = record
+    logger.info(f"Read {len(listings)} priced listings from {len(files)} files")
+    return listings
+
+
+def run_trainer(listing_type: str) -> bool:
+    listings = list(load_training_listings(listing_type).values())
+    if len(listings) < MIN_TRAINING_LISTINGS:
+        logger.error(
+            f"Need at least {MIN_TRAINING_LISTINGS} priced {listing_type} listings "
+            f"to train, found {len(listings)}."
+        )
+        return False
+
+    prices = np.array([record["price"] for record in listings], dtype=float)
+    low, high = np.percentile(prices, PRICE_PERCENTILES)
+    kept = [i for i, price in enumerate(prices) if low <= price <= high]
+    logger.info(
+        f"Training on {len(kept)} listings priced {low:,.0f}-{high:,.0f} "
+        f"({len(listings) - len(kept)} outliers dropped)"
+    )
+
+    model = PriceModel.fit(
+        listing_type,
+        [listing_features(listings[i]) for i in kept],
+        prices[kept],
+    )
+    path = model.save()
+    metrics = model.metrics
+    if metrics["holdout_listings"]:
+        logger.info(
+            f"Holdout MAE {metrics['mae']:,.0f}, median error "
+            f"{metrics['median_ape']:.1%} on {metrics['holdout_listings']} listings"
+        )
+    logger.success(f"Saved {listing_type} price model to {path}")
+    return True
@@ -0,0 +1,74 @@
+import re
+from typing import Iterable, List, Optional, Union
+
+# Canonical amenity tags and the spellings scraped adverts use for them. Tags
+# are stored in Listing.amenity_tags and accepted by the amenity filters.
+AMENITY_VOCABULARY = {
+    "24_hour_electricity": (
+        "24 hour electricity",
+        "24 hours electricity",
+        "24hr electricity",
+        "24 7 electricity",
+        "constant electricity",
+        "constant light",
+    ),
+    "air_conditioning": ("air conditioning", "air conditioner", "ac", "a c"),
+    "balcony": ("balcony",),
+    "boys_quarters": ("boys quarters", "boys quarter", "bq"),
+    "cctv": ("cctv", "cctv cameras", "security cameras"),
+    "chandelier": ("chandelier",),
+    "dining_area": ("dining area", "dining room"),
+    "dishwasher": ("dishwasher",),
+    "garden": ("garden",),
+    "gym": ("gym", "fitness centre", "fitness center"),
+    "hot_water": ("hot water", "water heater"),
+    "kitchen_cabinets": ("kitchen cabinets", "kitchen cabinet"),
+    "kitchen_shelf": ("kitchen shelf", "kitchen shelves"),
+    "microwave": ("microwave",),
+    "parking": ("parking", "parking space", "car park", "garage"),
+    "pop_ceiling": ("pop ceiling",),
+    "prepaid_meter": ("prepaid meter", "pre paid meter"),
+    "refrigerator": ("refrigerator", "fridge"),
+    "security": ("security", "24 hour security", "security guard", "security post"),
+    "swimming_pool": ("swimming pool", "pool"),
+    "tiled_floor": ("tiled floor", "tiled floors"),
+    "walled_gated": ("walled", "gated", "walled gated", "fenced", "wall fence"),
+    "wardrobe": ("wardrobe", "wardrobes", "built in wardrobe"),
+    "water_supply": ("water supply", "borehole", "water tank", "poly tank"),
+    "wifi": ("wifi", "wi fi", "internet"),
+}
+
+
+def _normalize(name: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+
+_ALIASES = {
+    _normalize(alias): tag
+    for tag, aliases in AMENITY_VOCABULARY.items()
+    for alias in (tag, *aliases)
+}
+
+
+def canonical_amenity(name: str) -> Optional[str]:
+    """Canonical tag for a scraped amenity name, or None if it is not known."""
+    return _ALIASES.get(_normalize(name))
+
+
+def normalize_amenities(amenities: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Map scraped amenities onto the canonical vocabulary
+
+    Args:
+        amenities: Comma-joined string as stored by the parser, or a list of names
+
+    Returns:
+        list: Sorted, de-duplicated tags; unknown amenities are dropped
+    """
+    if not amenities:
+        return []
+    if isinstance(amenities, str):
+        amenities = amenities.split(",")
+    tags = {canonical_amenity(name) for name in amenities}
+    tags.discard(None)
+    return sorted(tags)
@@ -1,6 +1,9 @@
 import re
 from datetime import datetime, timedelta
 
+from src.utils.geo_utils import area_coordinates
+from src.utils.hash_utils import compute_content_hash
+
 
 def clean_price(price_str):
     if not isinstance(price_str, str):
@@ -54,7 +57,7 @@ def parse_features(raw_features: dict) -> dict:
 
 
 def clean_listing(record: dict) -> dict:
-    return {
+    cleaned = {
         **record,
         "price": clean_price(record.get("price")),
         "posted_date": parse_posted_time(record.get("posted_date")),
@@ -62,3 +65,8 @@ def clean_listing(record: dict) -> dict:
         "bathrooms": safe_int(record.get("bathrooms")),
         "features": parse_features(record.get("features", {})),
     }
+    cleaned["latitude"], cleaned["longitude"] = area_coordinates(
+        record.get("area")
+    ) or (None, None)
+    cleaned["content_hash"] = compute_content_hash(cleaned)
+    return cleaned
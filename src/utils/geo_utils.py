@@ -0,0 +1,152 @@
+import math
+import re
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+GEOHASH_PRECISION = 9
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Approximate centroids (latitude, longitude) of Greater Accra areas as they
+# appear in listings. Coordinates are good to a few hundred metres, which is
+# the precision an area name gives anyway.
+AREA_CENTROIDS = {
+    "abelemkpe": (5.6060, -0.2090),
+    "abokobi": (5.7300, -0.1960),
+    "accra central": (5.5500, -0.2050),
+    "achimota": (5.6170, -0.2330),
+    "adabraka": (5.5630, -0.2080),
+    "adenta": (5.7080, -0.1550),
+    "airport residential": (5.6036, -0.1760),
+    "amasaman": (5.7020, -0.3000),
+    "ashaiman": (5.6950, -0.0330),
+    "asylum down": (5.5700, -0.2050),
+    "baatsona": (5.6280, -0.1130),
+    "cantonments": (5.5780, -0.1720),
+    "dansoman": (5.5470, -0.2600),
+    "dodowa": (5.8830, -0.0980),
+    "dome": (5.6500, -0.2350),
+    "dzorwulu": (5.6090, -0.2000),
+    "east legon": (5.6350, -0.1600),
+    "east legon hills": (5.6900, -0.1300),
+    "haatso": (5.6700, -0.2050),
+    "kaneshie": (5.5700, -0.2400),
+    "kasoa": (5.5340, -0.4200),
+    "kokomlemle": (5.5800, -0.2120),
+    "kpone": (5.7000, 0.0400),
+    "kwabenya": (5.6800, -0.2320),
+    "labadi": (5.5600, -0.1470),
+    "labone": (5.5660, -0.1720),
+    "lapaz": (5.6060, -0.2500),
+    "lashibi": (5.6350, -0.0650),
+    "legon": (5.6510, -0.1870),
+    "madina": (5.6680, -0.1660),
+    "mccarthy hill": (5.5570, -0.2920),
+    "north kaneshie": (5.5880, -0.2370),
+    "north legon": (5.6700, -0.1900),
+    "nungua": (5.6010, -0.0770),
+    "ofankor": (5.6600, -0.2650),
+    "ogbojo": (5.6560, -0.1460),
+    "osu": (5.5560, -0.1820),
+    "oyarifa": (5.7480, -0.1770),
+    "pokuase": (5.6850, -0.2800),
+    "ridge": (5.5630, -0.1960),
+    "roman ridge": (5.5980, -0.1940),
+    "sakumono": (5.6150, -0.0450),
+    "shiashie": (5.6190, -0.1660),
+    "spintex": (5.6360, -0.1030),
+    "taifa": (5.6600, -0.2450),
+    "tema": (5.6690, -0.0170),
+    "tesano": (5.6030, -0.2280),
+    "teshie": (5.5830, -0.1070),
+    "weija": (5.5590, -0.3340),
+}
+
+
+def _normalize_area(name: str) -> str:
+    name = " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+    return re.sub(r" (area|estate|estates)$", "", name)
+
+
+def area_coordinates(area: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) of an area's centroid, or None if it is not known."""
+    if not area:
+        return None
+    return AREA_CENTROIDS.get(_normalize_area(area))
+
+
+def encode_geohash(
+    latitude: float, longitude: float, precision: int = GEOHASH_PRECISION
+) -> str:
+    """Geohash of a point; nearby points share long prefixes."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, value, even = 0, 0, True
+    geohash = []
+    while len(geohash) < precision:
+        coord_range, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (coord_range[0] + coord_range[1]) / 2
+        value <<= 1
+        if coord >= middle:
+            value |= 1
+            coord_range[0] = middle
+        else:
+            coord_range[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            geohash.append(_GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(geohash)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    # Height and width of a geohash cell in degrees.
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lon_bits
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle around a point."""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lon_delta = lat_delta / max(math.cos(math.radians(latitude)), 1e-6)
+    return (
+        latitude - lat_delta,
+        longitude - lon_delta,
+        latitude + lat_delta,
+        longitude + lon_delta,
+    )
+
+
+def covering_geohashes(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float
+) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover a bounding box
+
+    Uses the finest precision at which the box spans at most three cells per
+    axis, so a handful of prefix range scans replace a scan of every listing.
+    """
+    precision = GEOHASH_PRECISION
+    while precision > 1:
+        height, width = _cell_size(precision)
+        if (max_lat - min_lat) <= 2 * height and (max_lon - min_lon) <= 2 * width:
+            break
+        precision -= 1
+    height, width = _cell_size(precision)
+
+    prefixes = set()
+    latitude = min_lat
+    while True:
+        longitude = min_lon
+        while True:
+            prefixes.add(encode_geohash(latitude, longitude, precision))
+            if longitude >= max_lon:
+                break
+            longitude = min(longitude + width, max_lon)
+        if latitude >= max_lat:
+            break
+        latitude = min(latitude + height, max_lat)
+    return sorted(prefixes)
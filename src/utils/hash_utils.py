@@ -0,0 +1,39 @@
+import hashlib
+
+import orjson
+
+# Listing fields that make up its content. Identity (listing_id), bookkeeping
+# columns (id, scraped_at, content_hash) and fields derived from others
+# (amenity_tags, geohash) are left out. So is posted_date: the cleaner resolves
+# "3 hours ago" against the time it runs, so it differs on every re-clean.
+HASHED_FIELDS = (
+    "listing_type",
+    "url",
+    "title",
+    "price",
+    "region",
+    "area",
+    "latitude",
+    "longitude",
+    "bedrooms",
+    "bathrooms",
+    "house_type",
+    "amenities",
+    "description",
+    "features",
+)
+
+
+def compute_content_hash(record: dict) -> str:
+    """
+    Canonical SHA-256 of a listing's content
+
+    Args:
+        record: Listing as a dict, from a cleaned file or an API payload
+
+    Returns:
+        str: Hex digest that only changes when a hashed field changes
+    """
+    canonical = {field: record.get(field) for field in HASHED_FIELDS}
+    payload = orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
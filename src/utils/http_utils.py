@@ -0,0 +1,112 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _CountingRetry(Retry):
+    """Retry policy that reports every retry attempt back to its session."""
+
+    def __init__(self, *args, on_retry=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, *args, **kwargs):
+        # Raises MaxRetryError once retries are exhausted, so only increments
+        # that schedule another attempt get counted.
+        retry = super().increment(*args, **kwargs)
+        if self.on_retry:
+            self.on_retry()
+        return retry
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    def __init__(self, *args, timeout: float, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session shared across publisher threads
+
+    Keeps up to `pool_size` keep-alive connections per host, applies a default
+    timeout to every call and retries idempotent methods (GET, PUT, DELETE) on
+    connection errors and transient statuses with exponential backoff plus
+    jitter. POST is never retried.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host
+        retries: Maximum number of retries per request
+        backoff: Backoff factor in seconds (backoff * 2 ** (retry - 1))
+        jitter: Upper bound in seconds of the random delay added to each backoff
+        timeout: Timeout in seconds for connecting and reading
+    """
+
+    def __init__(
+        self,
+        pool_size: int,
+        retries: int = 3,
+        backoff: float = 0.5,
+        jitter: float = 0.5,
+        timeout: float = 10.0,
+    ):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.retry_count = 0
+
+        retry = _CountingRetry(
+            total=retries,
+            backoff_factor=backoff,
+            backoff_jitter=jitter,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+            on_retry=self._record_retry,
+        )
+        self.adapter = _TimeoutHTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry,
+            timeout=timeout,
+        )
+        self.mount("http://", self.adapter)
+        self.mount("https://", self.adapter)
+
+    def _record_retry(self):
+        with self._lock:
+            self.retry_count += 1
+
+    def stats(self) -> dict:
+        """
+        Connection usage across all pools of this session
+
+        Returns:
+            dict: Requests sent, connections opened, reused connections and retries
+        """
+        pools = self.adapter.poolmanager.pools
+        requests_sent = connections = 0
+        for key in pools.keys():
+            pool = pools[key]
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": max(requests_sent - connections, 0),
+            "retries": self.retry_count,
+        }
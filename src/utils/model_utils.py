@@ -0,0 +1,256 @@
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import joblib
+import numpy as np
+
+from src.utils.amenity_utils import AMENITY_VOCABULARY, normalize_amenities
+from src.utils.settings import MODELS_DIR
+
+# Areas, house types and furnishing values seen fewer times than this in
+# training share the baseline (all-zero) encoding, as unknown values do.
+MIN_CATEGORY_COUNT = 3
+# Bedroom and bathroom counts above this are treated as this
+MAX_ROOMS = 10
+# z-score of the 10th/90th percentiles: price_low and price_high bound an 80%
+# range around the prediction
+INTERVAL_Z = 1.2816
+
+AMENITY_TAGS = sorted(AMENITY_VOCABULARY)
+
+
+class ListingFeatures(NamedTuple):
+    """Normalized model inputs; hashable, so predictions can be memoized."""
+
+    area: str
+    bedrooms: Optional[int]
+    bathrooms: Optional[int]
+    house_type: str
+    furnishing: str
+    amenities: tuple
+
+
+def _normalize(value) -> str:
+    if not isinstance(value, str):
+        return ""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", value.lower()).split())
+
+
+def _rooms(value) -> Optional[int]:
+    try:
+        return min(int(value), MAX_ROOMS)
+    except (TypeError, ValueError):
+        return None
+
+
+def listing_features(record: dict) -> ListingFeatures:
+    """
+    Model inputs of a cleaned listing or a prediction request
+
+    Furnishing is read from the record itself or from its scraped features;
+    amenities may be raw names or canonical tags.
+    """
+    furnishing = record.get("furnishing") or (record.get("features") or {}).get(
+        "furnishing"
+    )
+    return ListingFeatures(
+        area=_normalize(record.get("area")),
+        bedrooms=_rooms(record.get("bedrooms")),
+        bathrooms=_rooms(record.get("bathrooms")),
+        house_type=_normalize(record.get("house_type")),
+        furnishing=_normalize(furnishing),
+        amenities=tuple(normalize_amenities(record.get("amenities"))),
+    )
+
+
+class PriceModel:
+    """
+    Ridge regression of log price on listing features
+
+    Areas, house types and furnishing are one-hot encoded over the values
+    common enough in training; bedrooms and bathrooms are numeric, with
+    missing counts imputed by the training median and flagged; each
+    canonical amenity tag is a 0/1 column.
+
+    Args:
+        listing_type: 'rent' or 'sale'
+        categories: Encoded values of each categorical feature
+        room_medians: Imputed bedrooms and bathrooms
+        coef: Weights, intercept first
+        residual_std: Standard deviation of log-price residuals on held-out data
+        metrics: Evaluation results recorded at training time
+        version: Timestamp identifying the artifact
+    """
+
+    def __init__(
+        self,
+        listing_type: str,
+        categories: Dict[str, List[str]],
+        room_medians: Dict[str, float],
+        coef: np.ndarray,
+        residual_std: float,
+        metrics: dict,
+        version: str,
+    ):
+        self.listing_type = listing_type
+        self.categories = categories
+        self.room_medians = room_medians
+        self.coef = coef
+        self.residual_std = residual_std
+        self.metrics = metrics
+        self.version = version
+        self._build_columns()
+
+    def _build_columns(self):
+        # Column index of every encoded value; 0 is the intercept.
+        self.columns: Dict[tuple, int] = {}
+        names = [("bedrooms",), ("bedrooms_missing",)]
+        names += [("bathrooms",), ("bathrooms_missing",)]
+        for feature in ("area", "house_type", "furnishing"):
+            names += [(feature, value) for value in self.categories[feature]]
+        names += [("amenity", tag) for tag in AMENITY_TAGS]
+        for index, name in enumerate(names, start=1):
+            self.columns[name] = index
+        self.width = len(names) + 1
+
+    def design_matrix(self, rows: Sequence[ListingFeatures]) -> np.ndarray:
+        matrix = np.zeros((len(rows), self.width))
+        matrix[:, 0] = 1.0
+        columns = self.columns
+        for i, row in enumerate(rows):
+            for feature in ("bedrooms", "bathrooms"):
+                value = getattr(row, feature)
+                if value is None:
+                    matrix[i, columns[(f"{feature}_missing",)]] = 1.0
+                    value = self.room_medians[feature]
+                matrix[i, columns[(feature,)]] = value
+            for feature in ("area", "house_type", "furnishing"):
+                index = columns.get((feature, getattr(row, feature)))
+                if index is not None:
+                    matrix[i, index] = 1.0
+            for tag in row.amenities:
+                index = columns.get(("amenity", tag))
+                if index is not None:
+                    matrix[i, index] = 1.0
+        return matrix
+
+    def predict(self, rows: Sequence[ListingFeatures]) -> np.ndarray:
+        """(price, price_low, price_high) per row, in one matrix product."""
+        log_price = self.design_matrix(rows) @ self.coef
+        spread = INTERVAL_Z * self.residual_std
+        return np.exp(
+            np.column_stack([log_price, log_price - spread, log_price + spread])
+        )
+
+    @classmethod
+    def fit(
+        cls,
+        listing_type: str,
+        rows: Sequence[ListingFeatures],
+        prices: Sequence[float],
+        alpha: float = 1.0,
+        holdout: float = 0.2,
+        seed: int = 0,
+    ) -> "PriceModel":
+        """
+        Train on listings and their prices
+
+        A shuffled `holdout` share is scored first to record metrics and the
+        residual spread; the returned model is then refit on every listing.
+        """
+        rows, prices = list(rows), np.asarray(prices, dtype=float)
+        order = np.random.default_rng(seed).permutation(len(rows))
+        n_test = int(len(rows) * holdout)
+        test, train = order[:n_test], order[n_test:]
+
+        model = cls._fit_rows(
+            listing_type, [rows[i] for i in train], prices[train], alpha
+        )
+        if n_test:
+            predicted = model.predict([rows[i] for i in test])[:, 0]
+            residuals = np.log(prices[test]) - np.log(predicted)
+            errors = np.abs(predicted - prices[test])
+            metrics = {
+                "holdout_listings": int(n_test),
+                "mae": float(errors.mean()),
+                "median_ape": float(np.median(errors / prices[test])),
+            }
+        else:
+            residuals = np.log(prices) - np.log(model.predict(rows)[:, 0])
+            metrics = {"holdout_listings": 0}
+
+        final = cls._fit_rows(listing_type, rows, prices, alpha)
+        final.residual_std = float(residuals.std())
+        final.metrics = {"train_listings": len(rows), **metrics}
+        return final
+
+    @classmethod
+    def _fit_rows(
+        cls,
+        listing_type: str,
+        rows: List[ListingFeatures],
+        prices: np.ndarray,
+        alpha: float,
+    ) -> "PriceModel":
+        categories = {}
+        for feature in ("area", "house_type", "furnishing"):
+            counts = Counter(getattr(row, feature) for row in rows)
+            categories[feature] = sorted(
+                value
+                for value, count in counts.items()
+                if value and count >= MIN_CATEGORY_COUNT
+            )
+        room_medians = {}
+        for feature in ("bedrooms", "bathrooms"):
+            values = [getattr(row, feature) for row in rows]
+            known = [value for value in values if value is not None]
+            room_medians[feature] = float(np.median(known)) if known else 0.0
+
+        model = cls(
+            listing_type,
+            categories,
+            room_medians,
+            coef=np.zeros(0),
+            residual_std=0.0,
+            metrics={},
+            version=datetime.utcnow().strftime("%Y%m%d_%H%M%S"),
+        )
+        matrix = model.design_matrix(rows)
+        # Closed-form ridge; the intercept is not penalized.
+        penalty = alpha * np.eye(model.width)
+        penalty[0, 0] = 0.0
+        model.coef = np.linalg.solve(
+            matrix.T @ matrix + penalty, matrix.T @ np.log(prices)
+        )
+        return model
+
+    def save(self, directory: Path = MODELS_DIR) -> Path:
+        """Write a versioned artifact, price_model_<type>_<version>.joblib."""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"price_model_{self.listing_type}_{self.version}.joblib"
+        artifact = {
+            "listing_type": self.listing_type,
+            "categories": self.categories,
+            "room_medians": self.room_medians,
+            "coef": self.coef,
+            "residual_std": self.residual_std,
+            "metrics": self.metrics,
+            "version": self.version,
+        }
+        joblib.dump(artifact, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "PriceModel":
+        return cls(**joblib.load(path))
+
+
+def latest_model_path(
+    listing_type: str, directory: Path = MODELS_DIR
+) -> Optional[Path]:
+    """Newest artifact for a listing type, or None if none has been trained."""
+    paths: Iterable[Path] = directory.glob(f"price_model_{listing_type}_*.joblib")
+    return max(paths, key=lambda path: path.name, default=None)
@@ -1,5 +1,14 @@
+import fcntl
+import json
+import os
 import re
+from datetime import datetime
 from pathlib import Path
+from typing import Iterator
+
+from loguru import logger
+
+from src.utils.settings import FAILED_DIR
 
 
 def get_latest_scraped_file(directory: Path, listing_type: str) -> Path:
@@ -27,3 +36,141 @@ def get_latest_scraped_file(directory: Path, listing_type: str) -> Path:
         raise FileNotFoundError("No apartment listings file found in directory.")
 
     return sorted(files, key=lambda x: x[1], reverse=True)[0][0]
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Stream the records of a top-level JSON array without loading the whole file
+
+    Args:
+        path: JSON file containing a list of records
+        chunk_size: Number of characters read from disk at a time
+
+    Returns:
+        Iterator over the decoded records, in file order
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+
+    with open(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+
+            if not started:
+                buffer = buffer.lstrip()
+                if not buffer:
+                    if not chunk:
+                        return
+                    continue
+                if buffer[0] != "[":
+                    raise ValueError(f"Expected a JSON array in {path}")
+                buffer = buffer[1:]
+                started = True
+
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == "]":
+                    return
+                try:
+                    record, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break
+                yield record
+            buffer = buffer[pos:]
+
+            if not chunk:
+                raise ValueError(f"Truncated JSON array in {path}")
+
+
+def open_locked(path: Path, mode: str, blocking: bool = True):
+    """
+    Open a file while holding an exclusive lock on it
+
+    Dead-letter logs are appended to by publishers and compacted by replays;
+    the lock keeps the two from running on the same file at once. If the file
+    was replaced or removed between opening and locking, it is opened again,
+    so the lock is always held on the file currently at `path`.
+
+    Args:
+        path: File to open
+        mode: open() mode
+        blocking: Wait for the lock rather than giving up
+
+    Returns:
+        The open file, or None if `blocking` is False and the file is locked
+
+    Raises:
+        FileNotFoundError: `path` does not exist and `mode` does not create it
+    """
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    while True:
+        f = open(path, mode, buffering=1)
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            f.close()
+            return None
+        try:
+            if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()
+
+
+class DeadLetterLog:
+    """
+    Append-only NDJSON log of listings that could not be published
+
+    One file is written per publisher run. Each line holds the listing, the
+    reason of its last failure, how many times publishing it was attempted and
+    the content hash the API held for it at the time (None if it had none),
+    which lets a replay tell whether the listing was written since. The file is
+    only created once the first failure is recorded, and stays locked until
+    the log is closed so a replay does not compact it while it is written.
+
+    Args:
+        name: Name of the run, used as the file name prefix
+    """
+
+    def __init__(self, name: str):
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        self.path = FAILED_DIR / f"{name}_failed_{timestamp}.ndjson"
+        self.count = 0
+        self._file = None
+
+    def write(
+        self,
+        listing: dict,
+        reason: str | None,
+        attempts: int = 1,
+        stored_hash: str | None = None,
+    ):
+        if self._file is None:
+            FAILED_DIR.mkdir(parents=True, exist_ok=True)
+            self._file = open_locked(self.path, "a")
+
+        entry = {
+            "failed_at": datetime.utcnow().isoformat(),
+            "reason": reason,
+            "attempts": attempts,
+            "stored_hash": stored_hash,
+            "listing": listing,
+        }
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            logger.warning(f"{self.count} failed listings logged to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -11,3 +11,4 @@ CLEANED_DIR = Path(settings.cleaned_data_dir)
 LOG_DIR = Path(settings.logs_dir)
 FAILED_DIR = Path(settings.failed_data_dir)
 COMPRESSED_DIR = Path(settings.compressed_data_dir)
+MODELS_DIR = Path(settings.models_dir)
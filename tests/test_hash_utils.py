@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils import cleaner_utils
+from src.utils.cleaner_utils import clean_listing
+
+RAW_LISTING = {
+    "url": "https://example.com/listing/12345",
+    "listing_id": "12345",
+    "listing_type": "rent",
+    "title": "2 bedroom apartment for rent",
+    "price": "GH₵ 3,500",
+    "region": "Greater Accra",
+    "area": "East Legon",
+    "bedrooms": "2",
+    "bathrooms": "2",
+    "house_type": "Apartment",
+    "amenities": "Air Conditioning, Parking",
+    "description": "Newly built apartment close to the mall.",
+    "features": {"Property Size": "120sqm", "Furnishing": "Unfurnished"},
+}
+
+
+def clean_at(monkeypatch, record, now):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(cleaner_utils, "datetime", FrozenDatetime)
+    return clean_listing(dict(record))
+
+
+@pytest.mark.parametrize(
+    "posted_date", ["3 hours ago", "45 mins ago", "2 days ago", "??"]
+)
+def test_reclean_keeps_content_hash(monkeypatch, posted_date):
+    record = {**RAW_LISTING, "posted_date": posted_date}
+    first_run = datetime(2025, 5, 1, 23, 30)
+
+    first = clean_at(monkeypatch, record, first_run)
+    second = clean_at(monkeypatch, record, first_run + timedelta(hours=5))
+
+    assert first["posted_date"] != second["posted_date"]
+    assert first["content_hash"] == second["content_hash"]
+
+
+def test_content_change_changes_hash(monkeypatch):
+    now = datetime(2025, 5, 1, 12, 0)
+    record = {**RAW_LISTING, "posted_date": "3 hours ago"}
+
+    original = clean_at(monkeypatch, record, now)
+    repriced = clean_at(monkeypatch, {**record, "price": "GH₵ 3,800"}, now)
+
+    assert original["content_hash"] != repriced["content_hash"]